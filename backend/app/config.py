@@ -5,10 +5,68 @@ class Settings(BaseSettings):
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "task_management"
     
+    # MongoDB connection pool (per worker process) and timeouts
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: int = 60000
+    mongo_wait_queue_timeout_ms: int = 5000  # Fail instead of queueing forever when the pool is exhausted
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_connect_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: int = 30000
+    mongo_compressors: str = ""  # e.g. "zstd,snappy,zlib" (zstd needs zstandard, snappy needs python-snappy)
+    
+    # When indexes are built: "background" (one worker, after startup),
+    # "blocking" (before serving) or "off" (run python -m app.migrate on deploy)
+    index_build_mode: str = "background"
+    
+    # Read preference for list, calendar and stats reads; writes and
+    # single-document reads always go to the primary
+    mongo_list_read_preference: str = "secondaryPreferred"
+    mongo_max_staleness_seconds: int = -1  # -1 = no limit, otherwise at least 90
+    
     # JWT Settings
     secret_key: str = "your-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 24 hours
+    refresh_token_expire_days: int = 14
+    
+    # Stateless authentication: read-only endpoints and role checks trust the
+    # signed token claims instead of loading the user, and access tokens are
+    # short-lived (clients renew them with the refresh token)
+    stateless_auth: bool = False
+    stateless_access_token_expire_minutes: int = 15
+    revocation_sync_seconds: int = 10  # How often workers pick up revocations from each other
+    task_event_sync_seconds: int = 3  # How often task streams check for writes made through other workers
+    
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_executor: str = "thread"  # "thread" or "process"
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64  # Jobs allowed to wait before rejecting
+    
+    # Bulk import (python -m app.importer and the admin import routes)
+    import_chunk_size: int = 1000  # Rows validated and inserted together
+    import_hash_workers: int = 0  # Processes hashing passwords in python -m app.importer (0 = one per CPU)
+    
+    # Rate limits as "count/period" (second, minute, hour or day), per worker process
+    rate_limit_enabled: bool = True
+    rate_limit_login_ip: str = "20/minute"
+    rate_limit_login_email: str = "5/minute"
+    rate_limit_signup_ip: str = "5/minute"
+    rate_limit_refresh_ip: str = "30/minute"
+    rate_limit_task_writes: str = "120/minute"  # Per user: create, update, delete
+    rate_limit_task_bulk: str = "10/minute"  # Per user
+    
+    # Production server (python -m app.serve)
+    serve_workers: int = 0  # 0 = one per available CPU
+    serve_graceful_timeout_seconds: int = 30  # Time to finish in-flight requests on shutdown
+    
+    # Authenticated principal cache (per worker process)
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: int = 60
+    
+    # Observability
+    slow_request_ms: int = 0  # Log requests slower than this with their MongoDB breakdown (0 = off)
     
     # CORS - comma-separated string
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
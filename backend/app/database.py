@@ -1,28 +1,239 @@
-from pymongo import MongoClient
+import hashlib
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+import bson
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import DuplicateKeyError
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred
+)
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorClientSession,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase
+)
 from app.config import settings
+from app.utils.metrics import command_listener
 
-# MongoDB client
-client = MongoClient(settings.mongodb_url)
-db = client[settings.database_name]
+# MongoDB client (created by connect_db on first use in each worker process)
+client: Optional[AsyncIOMotorClient] = None
+
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def client_options() -> dict:
+    """Pool, timeout and compression options for the MongoDB client, from settings"""
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms,
+        "event_listeners": [command_listener],
+    }
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+def list_read_preference():
+    """
+    Read preference for list, calendar and stats queries
+    
+    Raises:
+        ValueError: If settings.mongo_list_read_preference is not a read preference mode
+    """
+    mode = settings.mongo_list_read_preference
+    if mode == "primary":
+        return Primary()
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    return READ_PREFERENCES[mode](max_staleness=settings.mongo_max_staleness_seconds)
+
+def connect_db() -> AsyncIOMotorClient:
+    """Create the async MongoDB client if this process does not have one yet"""
+    global client
+    if client is None:
+        list_read_preference()  # Fail at startup on an invalid setting
+        client = AsyncIOMotorClient(settings.mongodb_url, **client_options())
+    return client
+
+def _forget_client_after_fork():
+    # A client inherited across fork() is not usable, so each worker
+    # process creates its own on first use
+    global client
+    client = None
+
+os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+def close_db():
+    """Close the MongoDB client and release its connection pool"""
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+def get_database() -> AsyncIOMotorDatabase:
+    """Get database instance"""
+    return connect_db()[settings.database_name]
+
+async def list_read_session() -> AsyncIterator[Optional[AsyncIOMotorClientSession]]:
+    """
+    FastAPI dependency: session for the reads of one ETag-guarded list response
+    
+    The collection versions in the ETag and the listed documents are read
+    separately, and with a secondary read preference the reads can go to
+    different replica set members. In a causally consistent session each
+    read waits until its member has caught up with the previous one, so
+    the documents are never older than the versions. Reads from the
+    primary need no session, and None is yielded.
+    """
+    if settings.mongo_list_read_preference == "primary":
+        yield None
+        return
+    async with await connect_db().start_session(causal_consistency=True) as session:
+        yield session
+
+class CollectionProxy:
+    """
+    Module-level handle to a collection that resolves against the current client
+    
+    Routes import the collections at module load time, before the client is
+    created, so every attribute access is forwarded to the live collection.
+    List handles read with list_read_preference() instead of from the primary.
+    """
+    
+    def __init__(self, name: str, list_reads: bool = False):
+        self.name = name
+        self.list_reads = list_reads
+    
+    def get_collection(self) -> AsyncIOMotorCollection:
+        if self.list_reads:
+            return get_database().get_collection(self.name, read_preference=list_read_preference())
+        return get_database()[self.name]
+    
+    def __getattr__(self, attr):
+        return getattr(self.get_collection(), attr)
 
 # Collections
-users_collection = db["users"]
-tasks_collection = db["tasks"]
+users_collection = CollectionProxy("users")
+tasks_collection = CollectionProxy("tasks")
+versions_collection = CollectionProxy("collection_versions")  # Change counters for ETags
+revoked_tokens_collection = CollectionProxy("revoked_tokens")
+migrations_collection = CollectionProxy("migrations")  # Applied index version and build lease
+task_counters_collection = CollectionProxy("task_counters")  # Tasks per assignee and status
+
+# Read-only handles for list, calendar and stats endpoints (may read from secondaries)
+users_list_collection = CollectionProxy("users", list_reads=True)
+tasks_list_collection = CollectionProxy("tasks", list_reads=True)
+versions_list_collection = CollectionProxy("collection_versions", list_reads=True)
+task_counters_list_collection = CollectionProxy("task_counters", list_reads=True)
+
+# Task indexes, matching the role-scoped query shapes of the task routes.
+# Listings sort on (created_at, _id), so every list shape has an index that
+# ends with that sort and never needs an in-memory SORT stage.
+TASK_INDEXES = [
+    # User: assigned_to [+ status], newest first
+    IndexModel([("assigned_to", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("assigned_to", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    # Manager: $or of created_by / assigned_to branches, newest first
+    IndexModel([("created_by", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    # Admin: all tasks [+ status], newest first
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    # Due date windows (calendar, overdue counts)
+    IndexModel([("assigned_to", ASCENDING), ("due_date", ASCENDING)]),
+    IndexModel([("created_by", ASCENDING), ("due_date", ASCENDING)]),
+    IndexModel([("due_date", ASCENDING)]),
+    # Full-text search over title and description (title matches rank higher)
+    IndexModel(
+        [("title", TEXT), ("description", TEXT)],
+        weights={"title": 10, "description": 1},
+        name="task_text_search"
+    ),
+]
+
+# Other collections
+USER_INDEXES = [
+    IndexModel([("email", ASCENDING)], unique=True),
+]
+REVOKED_TOKEN_INDEXES = [
+    # Revoked tokens are deleted once they expire; workers sync by revoked_at
+    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    IndexModel([("revoked_at", ASCENDING)]),
+]
+
+COLLECTION_INDEXES = {
+    "users": USER_INDEXES,
+    "tasks": TASK_INDEXES,
+    "revoked_tokens": REVOKED_TOKEN_INDEXES,
+}
+
+# Fingerprint of every index definition; the build is skipped once it is recorded
+INDEX_VERSION = hashlib.sha1(bson.encode({
+    name: [index.document for index in indexes]
+    for name, indexes in COLLECTION_INDEXES.items()
+})).hexdigest()
+
+# How long a worker may hold the index build lease before another takes over
+INDEX_BUILD_LEASE = timedelta(minutes=10)
 
 # Create indexes for better performance
-def init_db():
-    """Initialize database indexes"""
-    # User indexes
-    users_collection.create_index("email", unique=True)
-    
-    # Task indexes
-    tasks_collection.create_index("assigned_to")
-    tasks_collection.create_index("created_by")
-    tasks_collection.create_index("status")
-    tasks_collection.create_index("due_date")
+async def init_db():
+    """Create every index and record the index version (safe to repeat)"""
+    for name, indexes in COLLECTION_INDEXES.items():
+        await get_database()[name].create_indexes(indexes)
     
+    await migrations_collection.update_one(
+        {"_id": "indexes"},
+        {"$set": {"version": INDEX_VERSION, "applied_at": datetime.utcnow()}},
+        upsert=True
+    )
     print("Database indexes created successfully")
 
-def get_database():
-    """Get database instance"""
-    return db
+async def ensure_indexes() -> bool:
+    """
+    Build the indexes unless they are already at INDEX_VERSION
+    
+    Only the worker holding the build lease runs the DDL, so a fleet of
+    workers starting together issues it once; the others return at once.
+    
+    Returns:
+        True if this worker built the indexes
+    """
+    state = await migrations_collection.find_one({"_id": "indexes"})
+    if state and state.get("version") == INDEX_VERSION:
+        return False
+    
+    # Take the lease: the upsert only succeeds if nobody holds a live one
+    now = datetime.utcnow()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        await migrations_collection.update_one(
+            {"_id": "index_build", "locked_until": {"$lt": now}},
+            {"$set": {"owner": owner, "locked_until": now + INDEX_BUILD_LEASE}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    
+    try:
+        await init_db()
+    finally:
+        await migrations_collection.update_one(
+            {"_id": "index_build", "owner": owner},
+            {"$set": {"locked_until": datetime.utcnow()}}
+        )
+    return True
@@ -0,0 +1,146 @@
+"""
+Denormalized user names on task documents
+
+Tasks store the names of their assignee and creator next to the IDs
+(assigned_to_name, created_by_name), so task reads need no user lookup.
+The task routes write the names whenever they set an assignee or creator;
+renaming or deleting a user schedules a background fan-out that rewrites
+the user's tasks. The checker finds and repairs any drift left behind,
+e.g. by a task written while a rename was being fanned out, and fills in
+the names on tasks created before they were stored.
+
+Usage (from the backend directory):
+    python -m app.denormalize            # report tasks with stale user names
+    python -m app.denormalize --repair   # rewrite them
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from bson import ObjectId
+from app.database import close_db, tasks_collection, users_collection
+from app.utils.etag import bump_collection_version
+
+logger = logging.getLogger(__name__)
+
+# User ID field of a task -> field holding that user's name
+TASK_NAME_FIELDS = {
+    "assigned_to": "assigned_to_name",
+    "created_by": "created_by_name",
+}
+
+# Fan-outs in flight (kept referenced until they finish)
+_pending_fan_outs: set = set()
+
+async def get_user_name(user_id: str) -> Optional[str]:
+    """Current name of a user, or None if the user does not exist"""
+    try:
+        user_doc = await users_collection.find_one({"_id": ObjectId(user_id)}, {"name": 1})
+    except:
+        return None
+    return user_doc["name"] if user_doc else None
+
+async def fan_out_user_name(user_id: str) -> int:
+    """
+    Rewrite the stored name of a user on every task that references them
+    
+    The name is read when the fan-out runs, so an older fan-out that runs
+    late does not overwrite a newer rename. Tasks already carrying the
+    name are not touched.
+    
+    Returns:
+        Number of tasks changed
+    """
+    name = await get_user_name(user_id)
+    modified = 0
+    for id_field, name_field in TASK_NAME_FIELDS.items():
+        result = await tasks_collection.update_many(
+            {id_field: user_id, name_field: {"$ne": name}},
+            {"$set": {name_field: name}}
+        )
+        modified += result.modified_count
+    
+    if modified:
+        await bump_collection_version("tasks")
+    return modified
+
+async def _run_fan_out(user_id: str):
+    start = time.perf_counter()
+    try:
+        modified = await fan_out_user_name(user_id)
+    except Exception:
+        logger.exception("Name fan-out for user %s failed, run python -m app.denormalize --repair", user_id)
+        return
+    logger.info("Updated the name of user %s on %d tasks in %.2fs", user_id, modified, time.perf_counter() - start)
+
+def schedule_name_fan_out(user_id: str):
+    """Start a background fan-out after a user was renamed or deleted"""
+    fan_out = asyncio.create_task(_run_fan_out(user_id))
+    _pending_fan_outs.add(fan_out)
+    fan_out.add_done_callback(_pending_fan_outs.discard)
+
+async def check_task_names(repair: bool = False) -> Dict[str, int]:
+    """
+    Find tasks whose stored user names differ from the users collection
+    
+    Walks the users once and counts (or, with repair, rewrites) the tasks
+    of each user whose name field is stale, using the assigned_to and
+    created_by indexes. Tasks referencing deleted users should carry no
+    name and are checked the same way.
+    
+    Args:
+        repair: Rewrite the stale names instead of only counting them
+    
+    Returns:
+        Number of stale tasks per name field
+    """
+    stale = {name_field: 0 for name_field in TASK_NAME_FIELDS.values()}
+    
+    user_names = {}
+    async for user_doc in users_collection.find({}, {"name": 1}):
+        user_names[str(user_doc["_id"])] = user_doc["name"]
+    
+    for id_field, name_field in TASK_NAME_FIELDS.items():
+        # Users that no longer exist but are still referenced by tasks
+        referenced = await tasks_collection.distinct(id_field)
+        expected = dict(user_names)
+        for user_id in referenced:
+            if user_id and user_id not in expected:
+                expected[user_id] = None
+        
+        for user_id, name in expected.items():
+            query = {id_field: user_id, name_field: {"$ne": name}}
+            if repair:
+                result = await tasks_collection.update_many(query, {"$set": {name_field: name}})
+                stale[name_field] += result.modified_count
+            else:
+                stale[name_field] += await tasks_collection.count_documents(query)
+    
+    if repair and any(stale.values()):
+        await bump_collection_version("tasks")
+    return stale
+
+async def check(repair: bool):
+    start = time.perf_counter()
+    try:
+        stale = await check_task_names(repair)
+    finally:
+        close_db()
+    
+    action = "Repaired" if repair else "Found"
+    for name_field, count in stale.items():
+        print(f"{action} {count} tasks with a stale {name_field}")
+    print(f"Checked in {time.perf_counter() - start:.2f}s")
+    if not repair and any(stale.values()):
+        print("Run python -m app.denormalize --repair to fix them")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the user names stored on tasks")
+    parser.add_argument("--repair", action="store_true", help="Rewrite stale names instead of only reporting them")
+    args = parser.parse_args()
+    
+    asyncio.run(check(args.repair))
+
+if __name__ == "__main__":
+    main()
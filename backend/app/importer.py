@@ -0,0 +1,367 @@
+"""
+Bulk import of users and tasks from CSV or NDJSON files
+
+Rows are read in chunks of settings.import_chunk_size. Each chunk is
+validated with the API models (UserCreate, TaskImport), its assignees are
+resolved with one users query, and its valid rows are written with one
+unordered insert_many. A rejected row is reported with its record number
+and does not stop the others. Passwords of imported users are hashed in
+parallel: on a process pool of its own from the command line, and on the
+app's shared password hashing pool through the API.
+
+Task rows name their assignee by ID (assigned_to) or by email
+(assigned_to_email); rows without either are assigned to the creator.
+
+Usage (from the backend directory):
+    python -m app.importer users people.csv
+    python -m app.importer tasks backlog.ndjson --created-by admin@example.com
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.database import CollectionProxy, close_db, tasks_collection, users_collection
+from app.models.imports import ImportResult, ImportRowError
+from app.models.task import TaskImport
+from app.models.user import UserCreate
+from app.task_counters import CounterChanges, apply_counter_changes
+from app.utils.etag import bump_collection_version
+from app.utils.export import FileFormat
+from app.utils.security import hash_passwords
+
+# Rejected rows listed in an import result (all of them are counted)
+MAX_REPORTED_ERRORS = 1000
+
+# MongoDB error code of a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+class ImportReport:
+    """Running totals and row errors of one import"""
+    
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+    
+    def reject(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(row=row, error=error))
+    
+    def result(self) -> ImportResult:
+        return ImportResult(
+            imported=self.imported,
+            failed=self.failed,
+            errors=sorted(self.errors, key=lambda error: error.row)
+        )
+
+def detect_format(filename: Optional[str]) -> Optional[FileFormat]:
+    """Guess the format of an import file from its extension"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return FileFormat.CSV
+    if extension in (".ndjson", ".jsonl"):
+        return FileFormat.NDJSON
+    return None
+
+def decode_upload(content: bytes) -> TextIO:
+    """
+    Decode an uploaded file as UTF-8 text (with or without a byte order mark)
+    
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    return io.StringIO(content.decode("utf-8-sig"), newline="")
+
+def read_rows(file: TextIO, file_format: FileFormat) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (record number, row) for every record of an import file
+    
+    Empty CSV cells are left out so that optional fields take their
+    defaults. A line that is not valid JSON is yielded as a ValueError.
+    """
+    if file_format == FileFormat.CSV:
+        for row_number, row in enumerate(csv.DictReader(file), start=1):
+            yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+    
+    row_number = 0
+    for line in file:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most size items"""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+def validation_message(error: ValidationError) -> str:
+    """One-line summary of a validation error, e.g. "title: Field required" """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    )
+
+def validate_chunk(chunk: List[Tuple[int, object]], model: type[BaseModel], report: ImportReport) -> list:
+    """Validate the rows of a chunk, rejecting the invalid ones"""
+    valid = []
+    for row_number, row in chunk:
+        if isinstance(row, Exception):
+            report.reject(row_number, str(row))
+            continue
+        try:
+            valid.append((row_number, model.model_validate(row)))
+        except ValidationError as e:
+            report.reject(row_number, validation_message(e))
+    return valid
+
+async def insert_chunk(
+    collection: CollectionProxy,
+    rows: List[Tuple[int, dict]],
+    report: ImportReport,
+    duplicate_error: str = "Duplicate key"
+) -> List[dict]:
+    """
+    Insert (record number, document) pairs with one unordered insert_many
+    
+    Returns:
+        The documents that were inserted
+    """
+    if not rows:
+        return []
+    
+    write_errors = {}
+    try:
+        await collection.insert_many([document for _, document in rows], ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            write_errors[error["index"]] = duplicate_error if error.get("code") == DUPLICATE_KEY_ERROR else error["errmsg"]
+    
+    inserted = []
+    for index, (row_number, document) in enumerate(rows):
+        if index in write_errors:
+            report.reject(row_number, write_errors[index])
+        else:
+            inserted.append(document)
+    report.imported += len(inserted)
+    return inserted
+
+def hash_workers() -> int:
+    return settings.import_hash_workers or os.cpu_count() or 1
+
+async def hash_passwords_parallel(passwords: List[str], executor: Executor, workers: int) -> List[str]:
+    """Hash passwords on a process pool, split into one job per worker"""
+    loop = asyncio.get_running_loop()
+    job_size = -(-len(passwords) // workers)
+    jobs = [
+        loop.run_in_executor(executor, hash_passwords, passwords[start:start + job_size])
+        for start in range(0, len(passwords), job_size)
+    ]
+    return [hashed for job_hashes in await asyncio.gather(*jobs) for hashed in job_hashes]
+
+async def import_users(
+    file: TextIO,
+    file_format: FileFormat,
+    hash_many: Optional[Callable[[List[str]], Awaitable[List[str]]]] = None
+) -> ImportResult:
+    """
+    Import users (name, email, password and optionally role per row)
+    
+    Emails that are already registered, or repeated within the file, are
+    rejected before any password is hashed.
+    
+    Args:
+        file: Import file as text
+        file_format: CSV or NDJSON
+        hash_many: Coroutine hashing a list of passwords; defaults to a
+            process pool of import_hash_workers started for this import
+    """
+    report = ImportReport()
+    seen_emails = set()
+    executor = None
+    
+    if hash_many is None:
+        workers = hash_workers()
+        
+        async def hash_many(passwords: List[str]) -> List[str]:
+            nonlocal executor
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            return await hash_passwords_parallel(passwords, executor, workers)
+    
+    try:
+        for chunk in chunked(read_rows(file, file_format), settings.import_chunk_size):
+            users = validate_chunk(chunk, UserCreate, report)
+            
+            # Check every email of the chunk against the users collection in one query
+            existing_cursor = users_collection.find(
+                {"email": {"$in": [user.email for _, user in users]}},
+                {"email": 1}
+            )
+            existing_emails = {user_doc["email"] async for user_doc in existing_cursor}
+            new_users = []
+            for row_number, user in users:
+                if user.email in existing_emails or user.email in seen_emails:
+                    report.reject(row_number, "Email already registered")
+                    continue
+                seen_emails.add(user.email)
+                new_users.append((row_number, user))
+            if not new_users:
+                continue
+            
+            hashes = await hash_many([user.password for _, user in new_users])
+            
+            now = datetime.utcnow()
+            user_docs = [
+                (row_number, {
+                    "name": user.name,
+                    "email": user.email,
+                    "role": user.role,
+                    "hashed_password": hashed_password,
+                    "created_at": now
+                })
+                for (row_number, user), hashed_password in zip(new_users, hashes)
+            ]
+            if await insert_chunk(users_collection, user_docs, report, "Email already registered"):
+                await bump_collection_version("users")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    return report.result()
+
+async def resolve_assignees(tasks: List[Tuple[int, TaskImport]], users: Dict[str, Optional[Tuple[str, str]]]):
+    """
+    Look up the assignees of a chunk that are not known yet, with one query
+    
+    Args:
+        tasks: Validated rows of the chunk
+        users: Cache of email or user ID -> (user ID, name), or None if no
+            such user exists; updated in place
+    """
+    emails = set()
+    object_ids = set()
+    for _, task in tasks:
+        if task.assigned_to_email:
+            if task.assigned_to_email not in users:
+                emails.add(task.assigned_to_email)
+        elif task.assigned_to and task.assigned_to not in users and ObjectId.is_valid(task.assigned_to):
+            object_ids.add(ObjectId(task.assigned_to))
+    
+    clauses = []
+    if emails:
+        clauses.append({"email": {"$in": list(emails)}})
+    if object_ids:
+        clauses.append({"_id": {"$in": list(object_ids)}})
+    if not clauses:
+        return
+    
+    for key in emails | {str(object_id) for object_id in object_ids}:
+        users[key] = None
+    async for user_doc in users_collection.find({"$or": clauses}, {"name": 1, "email": 1}):
+        user = (str(user_doc["_id"]), user_doc["name"])
+        users[user_doc["email"]] = user
+        users[user[0]] = user
+
+async def import_tasks(file: TextIO, file_format: FileFormat, created_by: str, created_by_name: str) -> ImportResult:
+    """
+    Import tasks created by the given user
+    
+    Rows take the TaskCreate fields (title, description, status, due_date,
+    assigned_to) or assigned_to_email instead of assigned_to. The user
+    names are stored with each task and the task counters are updated.
+    """
+    report = ImportReport()
+    users: Dict[str, Optional[Tuple[str, str]]] = {}
+    creator = (created_by, created_by_name)
+    
+    for chunk in chunked(read_rows(file, file_format), settings.import_chunk_size):
+        tasks = validate_chunk(chunk, TaskImport, report)
+        await resolve_assignees(tasks, users)
+        
+        now = datetime.utcnow()
+        task_docs = []
+        for row_number, task in tasks:
+            assignee_key = task.assigned_to_email or task.assigned_to
+            assignee = users.get(assignee_key) if assignee_key else creator
+            if assignee is None:
+                report.reject(row_number, "Assigned user not found")
+                continue
+            task_docs.append((row_number, {
+                "title": task.title,
+                "description": task.description,
+                "status": task.status,
+                "due_date": task.due_date,
+                "assigned_to": assignee[0],
+                "assigned_to_name": assignee[1],
+                "created_by": created_by,
+                "created_by_name": created_by_name,
+                "created_at": now,
+                "updated_at": now
+            }))
+        
+        inserted = await insert_chunk(tasks_collection, task_docs, report)
+        if inserted:
+            changes = CounterChanges()
+            for task_doc in inserted:
+                changes.add(task_doc, 1)
+            await apply_counter_changes(changes)
+            await bump_collection_version("tasks")
+    
+    return report.result()
+
+async def run_import(kind: str, path: str, file_format: FileFormat, created_by_email: Optional[str]):
+    start = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            if kind == "users":
+                result = await import_users(file, file_format)
+            else:
+                creator = await users_collection.find_one({"email": created_by_email}, {"name": 1})
+                if creator is None:
+                    raise SystemExit(f"No user with email {created_by_email}")
+                result = await import_tasks(file, file_format, str(creator["_id"]), creator["name"])
+    finally:
+        close_db()
+    
+    print(f"Imported {result.imported} {kind} in {time.perf_counter() - start:.1f}s, rejected {result.failed} rows")
+    for error in result.errors:
+        print(f"  row {error.row}: {error.error}")
+    if result.failed > len(result.errors):
+        print(f"  ... and {result.failed - len(result.errors)} more")
+
+def main():
+    parser = argparse.ArgumentParser(description="Import users or tasks from a CSV or NDJSON file")
+    parser.add_argument("kind", choices=["users", "tasks"])
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--format", choices=[file_format.value for file_format in FileFormat], help="Defaults to the file extension")
+    parser.add_argument("--created-by", metavar="EMAIL", help="Creator of the imported tasks (required for tasks)")
+    args = parser.parse_args()
+    
+    file_format = FileFormat(args.format) if args.format else detect_format(args.path)
+    if file_format is None:
+        parser.error("cannot tell the format from the file name, pass --format")
+    if args.kind == "tasks" and not args.created_by:
+        parser.error("--created-by is required when importing tasks")
+    
+    asyncio.run(run_import(args.kind, args.path, file_format, args.created_by))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Index advisor for the task list queries
+
+Runs explain() on every canonical get_tasks query shape and fails if a
+winning plan uses a collection scan or a blocking in-memory sort.
+
+Usage (from the backend directory):
+    python -m app.index_advisor
+    python -m app.index_advisor --create-indexes
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from bson import ObjectId
+from app.database import tasks_collection, close_db, init_db
+from app.models.task import TaskStatus
+from app.models.user import UserInDB
+from app.routes.tasks import build_task_query, TASK_LIST_SORT
+
+# Plan stages that mean a query is not served by an index
+BAD_STAGES = {"COLLSCAN", "SORT"}
+
+def make_user(role: str) -> UserInDB:
+    """Placeholder principal used only to build query shapes"""
+    return UserInDB(
+        id=str(ObjectId()),
+        name=f"Index advisor {role}",
+        email=f"{role}@index-advisor.local",
+        role=role,
+        hashed_password="",
+        created_at=datetime.utcnow()
+    )
+
+def canonical_query_shapes() -> List[Tuple[str, dict]]:
+    """
+    Every combination of role and filter that get_tasks issues
+    
+    Search is excluded: it is served by the text index and sorted by
+    relevance, which always needs an in-memory sort of the matches.
+    """
+    now = datetime.utcnow()
+    shapes = []
+    for role in ("admin", "manager", "user"):
+        user = make_user(role)
+        shapes.append((f"{role}: list", build_task_query(user)))
+        shapes.append((f"{role}: status", build_task_query(user, status=TaskStatus.TODO)))
+        shapes.append((
+            f"{role}: date range",
+            build_task_query(user, start_date=now, end_date=now + timedelta(days=31))
+        ))
+    return shapes
+
+def plan_stages(plan) -> List[str]:
+    """Collect every stage name in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+async def run_advisor(create_indexes: bool = False) -> bool:
+    """
+    Explain every canonical query shape and report the plan used
+    
+    Returns:
+        True if every shape is served by an index without a blocking sort
+    """
+    if create_indexes:
+        await init_db()
+    
+    all_ok = True
+    for name, query in canonical_query_shapes():
+        cursor = tasks_collection.find(query).sort(TASK_LIST_SORT).limit(50)
+        explain = await cursor.explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        bad = sorted(BAD_STAGES.intersection(stages))
+        
+        if bad:
+            all_ok = False
+            print(f"FAIL  {name:<22} {' > '.join(stages)}  (uses {', '.join(bad)})")
+        else:
+            print(f"OK    {name:<22} {' > '.join(stages)}")
+    
+    return all_ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check task queries against the existing indexes")
+    parser.add_argument(
+        "--create-indexes",
+        action="store_true",
+        help="Run init_db() before checking the query plans"
+    )
+    args = parser.parse_args()
+    
+    try:
+        all_ok = asyncio.run(run_advisor(args.create_indexes))
+    finally:
+        close_db()
+    
+    if not all_ok:
+        print("\nSome task queries are not fully served by an index")
+        sys.exit(1)
+    print("\nAll task queries are served by indexes")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings, get_cors_origins
-from app.database import init_db
+from app.database import close_db
+from app.middleware.auth import principal_cache
+from app.middleware.metrics import MetricsMiddleware
+from app.migrate import run_index_build
+from app.utils.revocation import revocation_list, run_revocation_sync
+from app.utils.events import run_task_event_sync
+from app.utils.security import shutdown_password_hasher
+from app.utils.metrics import render_metrics
+from app.utils.pagination import NEXT_CURSOR_HEADER
 from app.routes import auth, users, tasks
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background work without waiting for MongoDB
+    
+    The MongoDB client is created on first use, so a worker can serve
+    requests as soon as it has imported the app.
+    """
+    background_tasks = [
+        # Keep picking up tokens revoked by other workers
+        asyncio.create_task(run_revocation_sync()),
+        # Tell this worker's task streams about writes made through the others
+        asyncio.create_task(run_task_event_sync())
+    ]
+    if settings.index_build_mode == "blocking":
+        await run_index_build()
+    elif settings.index_build_mode == "background":
+        background_tasks.append(asyncio.create_task(run_index_build()))
+    
+    print("🚀 Application started successfully")
+    yield
+    for task in background_tasks:
+        task.cancel()
+    shutdown_password_hasher()
+    close_db()
+
 # Create FastAPI app
 app = FastAPI(
     title="Task Management API",
     description="Role-based task management system with JWT authentication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -18,19 +56,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Per-route latency and MongoDB usage (see /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(tasks.router)
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    init_db()
-    print("🚀 Application started successfully")
-
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -43,4 +79,13 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "principal_cache": principal_cache.stats(),
+        "revoked_tokens": len(revocation_list)
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
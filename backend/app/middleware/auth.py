@@ -1,53 +1,96 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
-from app.utils.security import decode_access_token
+from app.utils.security import ACCESS_TOKEN_TYPE, decode_access_token
+from app.utils.revocation import ensure_revocations_loaded, revocation_list, revoke_user_tokens
 from app.database import users_collection
-from app.models.user import UserInDB, TokenData
+from app.models.user import Principal, UserInDB, TokenData
+from app.config import settings
+from app.utils.cache import TTLCache
 from bson import ObjectId
 from typing import Optional
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> UserInDB:
+# Recently authenticated users, keyed by user ID
+principal_cache = TTLCache(
+    max_size=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds
+)
+
+def invalidate_principal(user_id: str):
+    """Drop a cached user so the next request reloads it from the database"""
+    principal_cache.invalidate(user_id)
+
+async def invalidate_user_sessions(user_id: str):
     """
-    Dependency to get the current authenticated user from JWT token
-    
-    Args:
-        credentials: HTTP Bearer token from Authorization header
+    Make the next request of a changed or deleted user see the change
     
-    Returns:
-        Current user object
-    
-    Raises:
-        HTTPException: If token is invalid or user not found
+    In stateless mode the user's tokens carry the old claims, so they are
+    revoked and the client has to refresh them.
     """
-    token = credentials.credentials
-    
-    credentials_exception = HTTPException(
+    invalidate_principal(user_id)
+    if settings.stateless_auth:
+        await revoke_user_tokens(user_id)
+
+def credentials_exception() -> HTTPException:
+    """Error returned for a missing, invalid, expired or revoked token"""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def verify_access_token(token: str) -> dict:
+    """
+    Decode an access token and check it against the in-memory revocation list
     
+    Returns:
+        Token claims
+    
+    Raises:
+        HTTPException: If the token is invalid, expired, revoked or not an access token
+    """
     try:
         payload = decode_access_token(token)
-        user_id: str = payload.get("user_id")
-        
-        if user_id is None:
-            raise credentials_exception
-            
     except JWTError:
-        raise credentials_exception
+        raise credentials_exception()
+    
+    if payload.get("user_id") is None or payload.get("type", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+        raise credentials_exception()
+    
+    await ensure_revocations_loaded()
+    if revocation_list.is_revoked(payload):
+        raise credentials_exception()
+    return payload
+
+async def authenticate_token(token: str) -> UserInDB:
+    """
+    Resolve a JWT access token to the user it was issued for
+    
+    Args:
+        token: Encoded JWT access token
+    
+    Returns:
+        Current user object
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id: str = (await verify_access_token(token))["user_id"]
+    
+    # Serve recently authenticated users from the cache
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
     
     # Fetch user from database
-    user_doc = users_collection.find_one({"_id": ObjectId(user_id)})
+    user_doc = await users_collection.find_one({"_id": ObjectId(user_id)})
     
     if user_doc is None:
-        raise credentials_exception
+        raise credentials_exception()
     
     # Convert MongoDB document to UserInDB model
     user = UserInDB(
@@ -58,9 +101,88 @@ async def get_current_user(
         hashed_password=user_doc["hashed_password"],
         created_at=user_doc["created_at"]
     )
+    principal_cache.set(user_id, user)
     
     return user
 
+async def authenticate_claims(token: str) -> Principal:
+    """
+    Resolve a JWT access token to a principal using only its signed claims
+    
+    Used in stateless mode. Tokens issued before names were embedded fall
+    back to authenticate_token.
+    """
+    payload = await verify_access_token(token)
+    if "name" not in payload:
+        return await authenticate_token(token)
+    
+    # The claims were signed by us, so skip validation
+    return Principal.model_construct(
+        id=payload["user_id"],
+        name=payload["name"],
+        email=payload["email"],
+        role=payload["role"]
+    )
+
+async def authenticate_principal(token: str) -> Principal:
+    """Resolve a token from claims in stateless mode, otherwise from the user record"""
+    if settings.stateless_auth:
+        return await authenticate_claims(token)
+    return await authenticate_token(token)
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UserInDB:
+    """
+    Dependency to get the current authenticated user from JWT token
+    
+    Args:
+        credentials: HTTP Bearer token from Authorization header
+    
+    Returns:
+        Current user object
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return await authenticate_token(credentials.credentials)
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """
+    Dependency for read-only endpoints and role checks
+    
+    With settings.stateless_auth the principal is built from the token
+    claims without touching the database; otherwise this is get_current_user.
+    """
+    return await authenticate_principal(credentials.credentials)
+
+async def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """Dependency returning the verified claims of the access token (e.g. for logout)"""
+    return await verify_access_token(credentials.credentials)
+
+async def get_current_principal_from_query(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    access_token: Optional[str] = Query(None)
+) -> Principal:
+    """
+    Dependency like get_current_principal that also accepts the token as a query parameter
+    
+    Browsers cannot set headers on EventSource connections, so streaming
+    endpoints accept ?access_token= as a fallback.
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await authenticate_principal(token)
+
 def require_role(allowed_roles: list[str]):
     """
     Dependency factory to check if user has required role
@@ -71,7 +193,7 @@ def require_role(allowed_roles: list[str]):
     Returns:
         Dependency function that checks user role
     """
-    async def role_checker(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
+    async def role_checker(current_user: Principal = Depends(get_current_principal)) -> Principal:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,86 @@
+"""Per-request timing, MongoDB attribution and slow request logging"""
+import logging
+import time
+from typing import Dict, Optional
+from app.config import settings
+from app.utils.metrics import (
+    RequestStats,
+    current_request_stats,
+    http_request_duration,
+    http_request_mongo_commands,
+    http_request_mongo_duration
+)
+
+logger = logging.getLogger("app.slow_requests")
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and MongoDB usage per route
+    
+    Requests are labelled with the route template (e.g. /api/tasks/{task_id})
+    rather than the raw path, so metric cardinality stays bounded. Each
+    response carries a Server-Timing header with the time spent in MongoDB,
+    and requests slower than settings.slow_request_ms are logged with their
+    MongoDB command breakdown.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict] = None
+    
+    def route_path(self, scope) -> str:
+        """Route template of the endpoint that handled the request"""
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - stats.started) * 1000
+                server_timing = (
+                    f'db;dur={stats.mongo_seconds * 1000:.1f};desc="{len(stats.commands)} queries", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", server_timing.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            self.record(scope, stats, status_code)
+    
+    def record(self, scope, stats: RequestStats, status_code: int):
+        elapsed = time.perf_counter() - stats.started
+        method = scope["method"]
+        route = self.route_path(scope)
+        
+        http_request_duration.observe((method, route, str(status_code)), elapsed)
+        http_request_mongo_commands.observe((method, route), len(stats.commands))
+        http_request_mongo_duration.inc((method, route), stats.mongo_seconds)
+        
+        if settings.slow_request_ms and elapsed * 1000 >= settings.slow_request_ms:
+            logger.warning(
+                "Slow request: %s %s -> %s in %.1f ms, %d MongoDB commands in %.1f ms: %s",
+                method,
+                scope["path"],
+                status_code,
+                elapsed * 1000,
+                len(stats.commands),
+                stats.mongo_seconds * 1000,
+                stats.breakdown() or "none"
+            )
@@ -0,0 +1,51 @@
+"""Rate limiting dependencies, applied before any password hashing or database work"""
+from fastapi import Request
+from app.config import settings
+from app.utils.rate_limit import InMemoryTokenBucketStore, RateLimit, RateLimiter
+from app.utils.security import decode_access_token
+
+# Per-route budgets (see the rate_limit_* settings)
+LOGIN_IP_LIMIT = RateLimit.parse("login_ip", settings.rate_limit_login_ip)
+LOGIN_EMAIL_LIMIT = RateLimit.parse("login_email", settings.rate_limit_login_email)
+SIGNUP_IP_LIMIT = RateLimit.parse("signup_ip", settings.rate_limit_signup_ip)
+REFRESH_IP_LIMIT = RateLimit.parse("refresh_ip", settings.rate_limit_refresh_ip)
+TASK_WRITE_USER_LIMIT = RateLimit.parse("task_write_user", settings.rate_limit_task_writes)
+TASK_BULK_USER_LIMIT = RateLimit.parse("task_bulk_user", settings.rate_limit_task_bulk)
+
+# Buckets are per worker process; swap the store for a shared one to pool them
+rate_limiter = RateLimiter(InMemoryTokenBucketStore(), enabled=settings.rate_limit_enabled)
+
+def client_ip(request: Request) -> str:
+    """
+    Address of the client
+    
+    Behind a reverse proxy run uvicorn with --proxy-headers and
+    --forwarded-allow-ips so this is the real client, not the proxy.
+    """
+    return request.client.host if request.client else "unknown"
+
+def limit_by_ip(limit: RateLimit):
+    """Dependency factory charging one request to the client's IP"""
+    async def check_ip(request: Request):
+        await rate_limiter.check(limit, client_ip(request))
+    
+    return check_ip
+
+def limit_by_user(limit: RateLimit):
+    """
+    Dependency factory charging one request to the authenticated user
+    
+    The user ID is read from the token signature alone, without loading the
+    user; requests without a valid token are charged to their IP instead.
+    """
+    async def check_user(request: Request):
+        key = f"ip:{client_ip(request)}"
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                key = f"user:{decode_access_token(token)['user_id']}"
+            except:
+                pass
+        await rate_limiter.check(limit, key)
+    
+    return check_user
@@ -0,0 +1,52 @@
+"""
+Index migrations
+
+Builds the MongoDB indexes once per index version (see
+app.database.INDEX_VERSION). Run it from the deploy pipeline with
+INDEX_BUILD_MODE=off on the workers, or let one worker do it in the
+background after startup.
+
+Usage (from the backend directory):
+    python -m app.migrate           # build the indexes if their definitions changed
+    python -m app.migrate --force   # rebuild even if the version is already recorded
+"""
+import argparse
+import asyncio
+import logging
+import time
+from app.database import INDEX_VERSION, close_db, ensure_indexes, init_db
+
+logger = logging.getLogger(__name__)
+
+async def run_index_build():
+    """Build the indexes from a worker, logging instead of raising on failure"""
+    try:
+        await ensure_indexes()
+    except Exception:
+        logger.exception("Index build failed, run python -m app.migrate")
+
+async def migrate(force: bool):
+    start = time.perf_counter()
+    try:
+        if force:
+            await init_db()
+            built = True
+        else:
+            built = await ensure_indexes()
+    finally:
+        close_db()
+    
+    if built:
+        print(f"Indexes at version {INDEX_VERSION[:12]} built in {time.perf_counter() - start:.2f}s")
+    else:
+        print(f"Indexes already at version {INDEX_VERSION[:12]} (or being built by another process)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the MongoDB indexes")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the index version is recorded")
+    args = parser.parse_args()
+    
+    asyncio.run(migrate(args.force))
+
+if __name__ == "__main__":
+    main()
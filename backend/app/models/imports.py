@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    """A rejected row of an import file"""
+    row: int  # 1-based record number (the CSV header is not counted)
+    error: str
+
+class ImportResult(BaseModel):
+    """Schema for bulk import responses"""
+    imported: int
+    failed: int
+    errors: List[ImportRowError]  # The first MAX_REPORTED_ERRORS rejected rows
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "imported": 998,
+                "failed": 2,
+                "errors": [
+                    {"row": 17, "error": "title: Field required"},
+                    {"row": 408, "error": "Assigned user not found"}
+                ]
+            }
+        }
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -28,6 +28,10 @@ class TaskUpdate(BaseModel):
     due_date: Optional[datetime] = None
     assigned_to: Optional[str] = None
 
+class TaskImport(TaskCreate):
+    """Schema for one row of a task import (assignee by ID or by email)"""
+    assigned_to_email: Optional[EmailStr] = None
+
 class TaskInDB(TaskBase):
     """Task schema as stored in database"""
     id: str
@@ -55,9 +59,9 @@ class TaskResponse(TaskBase):
     """Schema for task API responses"""
     id: str
     assigned_to: Optional[str] = None
-    assigned_to_name: Optional[str] = None  # Populated from user lookup
+    assigned_to_name: Optional[str] = None  # Stored on the task (see app.denormalize)
     created_by: str
-    created_by_name: Optional[str] = None  # Populated from user lookup
+    created_by_name: Optional[str] = None  # Stored on the task (see app.denormalize)
     created_at: datetime
     updated_at: datetime
     
@@ -77,3 +81,110 @@ class TaskResponse(TaskBase):
                 "updated_at": "2025-01-20T14:15:00Z"
             }
         }
+
+class TaskSparseResponse(BaseModel):
+    """Schema for task list items requested with ?fields= (only id is always present)"""
+    id: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    due_date: Optional[datetime] = None
+    assigned_to: Optional[str] = None
+    assigned_to_name: Optional[str] = None
+    created_by: Optional[str] = None
+    created_by_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "507f1f77bcf86cd799439011",
+                "status": "in_progress"
+            }
+        }
+
+class TaskCalendarItem(BaseModel):
+    """Compact task schema for calendar views"""
+    id: str
+    title: str
+    status: TaskStatus
+    due_date: datetime
+    assigned_to_name: Optional[str] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "507f1f77bcf86cd799439011",
+                "title": "Complete project documentation",
+                "status": "in_progress",
+                "due_date": "2025-01-25T17:00:00Z",
+                "assigned_to_name": "Jane Smith"
+            }
+        }
+
+class TaskStats(BaseModel):
+    """Schema for dashboard task statistics"""
+    total: int = 0
+    todo: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    overdue: int = 0  # Not completed and past due date
+    due_this_week: int = 0  # Not completed and due within the next 7 days
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 42,
+                "todo": 20,
+                "in_progress": 12,
+                "completed": 10,
+                "overdue": 3,
+                "due_this_week": 7
+            }
+        }
+
+class TaskBulkAction(str, Enum):
+    """Bulk task operation enumeration"""
+    CREATE = "create"
+    UPDATE_STATUS = "update_status"
+    REASSIGN = "reassign"
+    DELETE = "delete"
+
+class TaskBulkOperation(BaseModel):
+    """Schema for a single operation in a bulk request"""
+    action: TaskBulkAction
+    task_id: Optional[str] = None  # update_status, reassign, delete
+    task: Optional[TaskCreate] = None  # create
+    status: Optional[TaskStatus] = None  # update_status
+    assigned_to: Optional[str] = None  # reassign (User ID)
+
+class TaskBulkRequest(BaseModel):
+    """Schema for bulk task operations"""
+    operations: List[TaskBulkOperation] = Field(..., min_length=1, max_length=1000)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "operations": [
+                    {"action": "create", "task": {"title": "Write release notes"}},
+                    {"action": "update_status", "task_id": "507f1f77bcf86cd799439011", "status": "completed"},
+                    {"action": "reassign", "task_id": "507f1f77bcf86cd799439013", "assigned_to": "507f1f77bcf86cd799439012"},
+                    {"action": "delete", "task_id": "507f1f77bcf86cd799439014"}
+                ]
+            }
+        }
+
+class TaskBulkResult(BaseModel):
+    """Outcome of a single bulk operation"""
+    index: int
+    action: TaskBulkAction
+    success: bool
+    task_id: Optional[str] = None
+    error: Optional[str] = None
+
+class TaskBulkResponse(BaseModel):
+    """Schema for bulk task operation responses"""
+    succeeded: int
+    failed: int
+    results: List[TaskBulkResult]
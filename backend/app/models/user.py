@@ -24,9 +24,12 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
-class UserInDB(UserBase):
-    """User schema as stored in database"""
+class Principal(UserBase):
+    """Authenticated user as needed for permission checks (may come from token claims)"""
     id: str
+
+class UserInDB(Principal):
+    """User schema as stored in database"""
     hashed_password: str
     created_at: datetime
     
@@ -57,6 +60,45 @@ class UserResponse(UserBase):
             }
         }
 
+class UserSparseResponse(BaseModel):
+    """Schema for user list items requested with ?fields= (only id is always present)"""
+    id: str
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    role: Optional[UserRole] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "507f1f77bcf86cd799439011",
+                "name": "John Doe"
+            }
+        }
+
+class UserWorkload(BaseModel):
+    """Task counts of one user per status (admin workload view)"""
+    id: str
+    name: str
+    role: UserRole
+    todo: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    total: int = 0
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "507f1f77bcf86cd799439011",
+                "name": "John Doe",
+                "role": "user",
+                "todo": 4,
+                "in_progress": 2,
+                "completed": 17,
+                "total": 23
+            }
+        }
+
 class UserUpdate(BaseModel):
     """Schema for updating user information"""
     name: Optional[str] = None
@@ -65,9 +107,18 @@ class UserUpdate(BaseModel):
 class Token(BaseModel):
     """JWT token response schema"""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     user: UserResponse
 
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token for new tokens"""
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    """Schema for logging out (the refresh token is revoked too when given)"""
+    refresh_token: Optional[str] = None
+
 class TokenData(BaseModel):
     """Data stored in JWT token"""
     user_id: str
@@ -1,13 +1,81 @@
-from fastapi import APIRouter, HTTPException, status
-from app.models.user import UserCreate, UserLogin, Token, UserResponse
+from fastapi import APIRouter, Depends, HTTPException, status
+from jose import JWTError
+from app.models.user import UserCreate, UserLogin, Token, UserResponse, RefreshRequest, LogoutRequest
 from app.database import users_collection
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.middleware.auth import get_current_claims, invalidate_principal
+from app.middleware.rate_limit import (
+    LOGIN_EMAIL_LIMIT,
+    LOGIN_IP_LIMIT,
+    REFRESH_IP_LIMIT,
+    SIGNUP_IP_LIMIT,
+    limit_by_ip,
+    rate_limiter
+)
+from app.utils.etag import bump_collection_version
+from app.utils.revocation import revoke_token
+from app.utils.security import (
+    hash_password_async,
+    verify_and_rehash_password_async,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    PasswordHasherBusy,
+    REFRESH_TOKEN_TYPE
+)
 from datetime import datetime
+from typing import Optional
 from bson import ObjectId
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
-@router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
+def hasher_busy_exception() -> HTTPException:
+    """Error returned when the password hashing pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def token_expiry(payload: dict) -> datetime:
+    """Expiry of a decoded token as a naive UTC datetime"""
+    return datetime.utcfromtimestamp(payload["exp"])
+
+def issue_tokens(user_doc: dict) -> Token:
+    """
+    Create the access and refresh tokens for a user document
+    
+    The access token embeds the user's name, email and role so that in
+    stateless mode requests can be authorized from the claims alone.
+    """
+    user_id = str(user_doc["_id"])
+    token_data = {
+        "user_id": user_id,
+        "name": user_doc["name"],
+        "email": user_doc["email"],
+        "role": user_doc["role"]
+    }
+    
+    # Prepare user response
+    user_response = UserResponse(
+        id=user_id,
+        name=user_doc["name"],
+        email=user_doc["email"],
+        role=user_doc["role"],
+        created_at=user_doc["created_at"]
+    )
+    
+    return Token(
+        access_token=create_access_token(token_data),
+        refresh_token=create_refresh_token(user_id),
+        user=user_response
+    )
+
+@router.post(
+    "/signup",
+    response_model=Token,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip(SIGNUP_IP_LIMIT))]
+)
 async def signup(user_data: UserCreate):
     """
     Register a new user
@@ -18,15 +86,18 @@ async def signup(user_data: UserCreate):
     - Returns JWT token
     """
     # Check if user already exists
-    existing_user = users_collection.find_one({"email": user_data.email})
+    existing_user = await users_collection.find_one({"email": user_data.email})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Hash the password
-    hashed_pwd = hash_password(user_data.password)
+    # Hash the password on the worker pool
+    try:
+        hashed_pwd = await hash_password_async(user_data.password)
+    except PasswordHasherBusy:
+        raise hasher_busy_exception()
     
     # Create user document
     user_doc = {
@@ -38,41 +109,26 @@ async def signup(user_data: UserCreate):
     }
     
     # Insert into database
-    result = users_collection.insert_one(user_doc)
-    user_id = str(result.inserted_id)
+    result = await users_collection.insert_one(user_doc)
+    await bump_collection_version("users")
+    user_doc["_id"] = result.inserted_id
     
-    # Create access token
-    token_data = {
-        "user_id": user_id,
-        "email": user_data.email,
-        "role": user_data.role
-    }
-    access_token = create_access_token(token_data)
-    
-    # Prepare user response
-    user_response = UserResponse(
-        id=user_id,
-        name=user_data.name,
-        email=user_data.email,
-        role=user_data.role,
-        created_at=user_doc["created_at"]
-    )
-    
-    return Token(
-        access_token=access_token,
-        user=user_response
-    )
+    return issue_tokens(user_doc)
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_by_ip(LOGIN_IP_LIMIT))])
 async def login(credentials: UserLogin):
     """
     Login with email and password
     
     - Validates credentials
     - Returns JWT token on success
+    - Rate limited per client IP and per email, before any password check
     """
+    # Throttle guessing against a single account from many addresses
+    await rate_limiter.check(LOGIN_EMAIL_LIMIT, credentials.email.lower())
+    
     # Find user by email
-    user_doc = users_collection.find_one({"email": credentials.email})
+    user_doc = await users_collection.find_one({"email": credentials.email})
     
     if not user_doc:
         raise HTTPException(
@@ -80,32 +136,86 @@ async def login(credentials: UserLogin):
             detail="Invalid email or password"
         )
     
-    # Verify password
-    if not verify_password(credentials.password, user_doc["hashed_password"]):
+    # Verify password on the worker pool
+    try:
+        is_valid, new_hash = await verify_and_rehash_password_async(
+            credentials.password,
+            user_doc["hashed_password"]
+        )
+    except PasswordHasherBusy:
+        raise hasher_busy_exception()
+    
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    # Create access token
-    user_id = str(user_doc["_id"])
-    token_data = {
-        "user_id": user_id,
-        "email": user_doc["email"],
-        "role": user_doc["role"]
-    }
-    access_token = create_access_token(token_data)
+    # Upgrade hashes created with outdated bcrypt settings
+    if new_hash:
+        await users_collection.update_one(
+            {"_id": user_doc["_id"]},
+            {"$set": {"hashed_password": new_hash}}
+        )
+        invalidate_principal(str(user_doc["_id"]))
     
-    # Prepare user response
-    user_response = UserResponse(
-        id=user_id,
-        name=user_doc["name"],
-        email=user_doc["email"],
-        role=user_doc["role"],
-        created_at=user_doc["created_at"]
-    )
+    return issue_tokens(user_doc)
+
+@router.post("/refresh", response_model=Token, dependencies=[Depends(limit_by_ip(REFRESH_IP_LIMIT))])
+async def refresh(refresh_data: RefreshRequest):
+    """
+    Exchange a refresh token for a new access token and refresh token
     
-    return Token(
-        access_token=access_token,
-        user=user_response
+    - Refresh tokens are single-use: the presented one is revoked
+    - Reloads the user, so role and name changes reach the new claims
+    """
+    invalid_refresh_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token"
     )
+    
+    try:
+        payload = decode_access_token(refresh_data.refresh_token)
+    except JWTError:
+        raise invalid_refresh_token
+    
+    if payload.get("type") != REFRESH_TOKEN_TYPE or not payload.get("jti"):
+        raise invalid_refresh_token
+    
+    # Revoking is atomic, so a token that was already used or logged out fails here
+    if not await revoke_token(payload["jti"], token_expiry(payload)):
+        raise invalid_refresh_token
+    
+    try:
+        user_doc = await users_collection.find_one({"_id": ObjectId(payload["user_id"])})
+    except:
+        raise invalid_refresh_token
+    
+    if not user_doc:
+        raise invalid_refresh_token
+    
+    return issue_tokens(user_doc)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    claims: dict = Depends(get_current_claims)
+):
+    """
+    Log out
+    
+    - Revokes the access token used for this request
+    - Also revokes the refresh token, if one is given
+    """
+    if claims.get("jti"):
+        await revoke_token(claims["jti"], token_expiry(claims))
+    
+    if logout_data and logout_data.refresh_token:
+        try:
+            payload = decode_access_token(logout_data.refresh_token)
+        except JWTError:
+            payload = None
+        
+        # Only the caller's own refresh tokens can be revoked
+        if payload and payload.get("type") == REFRESH_TOKEN_TYPE and payload.get("user_id") == claims["user_id"]:
+            await revoke_token(payload["jti"], token_expiry(payload))
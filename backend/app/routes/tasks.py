@@ -1,26 +1,158 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from app.models.task import TaskCreate, TaskUpdate, TaskResponse, TaskStatus
-from app.models.user import UserInDB
-from app.database import tasks_collection, users_collection
-from app.middleware.auth import get_current_user, require_admin
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, status, Depends, File, Query, Request, Response, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.models.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskSparseResponse, TaskStatus, TaskStats, TaskCalendarItem,
+    TaskBulkAction, TaskBulkOperation, TaskBulkRequest, TaskBulkResult, TaskBulkResponse
+)
+from app.models.user import Principal, UserInDB
+from app.models.imports import ImportResult
+from app.importer import decode_upload, detect_format, import_tasks
+from app.database import list_read_session, tasks_collection, tasks_list_collection, users_collection
+from app.middleware.auth import (
+    get_current_user,
+    get_current_principal,
+    get_current_principal_from_query,
+    require_admin
+)
+from app.middleware.rate_limit import TASK_BULK_USER_LIMIT, TASK_WRITE_USER_LIMIT, limit_by_user
+from app.task_counters import CounterChanges, apply_counter_changes, count_task_change
 from app.utils.permissions import can_view_task, can_edit_task, can_delete_task, can_assign_task
-from datetime import datetime
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, created_at_keyset_query
+from app.utils.events import RESYNC_EVENT, task_events, event_for_user
+from app.utils.serialization import json_response
+from app.utils.export import MEDIA_TYPES, CsvEncoder, FileFormat, encode_ndjson, iter_batches
+from app.utils.projection import parse_fields, build_projection, select_fields
+from app.utils.etag import bump_collection_version, check_etag, not_modified_response, set_etag
+from datetime import datetime, timedelta, timezone
 from bson import ObjectId
-from typing import List, Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import Dict, Iterable, List, Optional, Union
 
 router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 
-def get_user_name(user_id: Optional[str]) -> Optional[str]:
-    """Helper function to get user name from ID"""
-    if not user_id:
-        return None
-    try:
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
-        return user["name"] if user else None
-    except:
-        return None
+# Sort order of task listings (newest first, _id breaks ties for cursors)
+TASK_LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+# Fields that can be requested with ?fields= on the task list
+TASK_RESPONSE_FIELDS = list(TaskResponse.model_fields)
+
+# Document field each task response field is read from, when it differs
+TASK_FIELD_SOURCES = {"id": "_id"}
+
+# Seconds between keep-alive comments on idle change streams
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Widest date window a calendar request may ask for
+MAX_CALENDAR_WINDOW = timedelta(days=366)
+
+# Rows per MongoDB batch and per chunk written to the client on exports
+EXPORT_BATCH_SIZE = 1000
+
+# Sort order of search results (most relevant first)
+TASK_SEARCH_SORT = [("score", {"$meta": "textScore"})] + TASK_LIST_SORT
+
+async def get_user_names(user_ids: Iterable[Optional[str]]) -> Dict[str, str]:
+    """
+    Resolve a batch of user IDs to names with a single query
+    
+    Args:
+        user_ids: User IDs to assign tasks to (may repeat or be None)
+    
+    Returns:
+        Mapping of user ID to user name for every user that was found
+    """
+    object_ids = []
+    for user_id in set(user_ids):
+        if not user_id:
+            continue
+        try:
+            object_ids.append(ObjectId(user_id))
+        except:
+            continue
+    
+    if not object_ids:
+        return {}
+    
+    cursor = users_collection.find({"_id": {"$in": object_ids}}, {"name": 1})
+    return {str(user_doc["_id"]): user_doc["name"] async for user_doc in cursor}
+
+def build_role_query(current_user: Principal) -> dict:
+    """
+    Build the base task query for the tasks a user is allowed to see
+    
+    - Admin: all tasks (no filter)
+    - Manager: tasks they created or that are assigned to them
+    - User: only tasks assigned to them
+    """
+    if current_user.role == "user":
+        return {"assigned_to": current_user.id}
+    if current_user.role == "manager":
+        return {"$or": [
+            {"created_by": current_user.id},
+            {"assigned_to": current_user.id}
+        ]}
+    return {}
+
+def build_task_query(
+    current_user: Principal,
+    status: Optional[TaskStatus] = None,
+    search: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> dict:
+    """Build the task list query: role-based visibility plus the optional filters"""
+    # Build query based on role
+    query = build_role_query(current_user)
+    
+    # Apply filters
+    if status:
+        query["status"] = status
+    
+    if search:
+        # Full-text search in title and description (served by the text index)
+        query["$text"] = {"$search": search}
+    
+    # Date range filter for calendar
+    if start_date or end_date:
+        query["due_date"] = {}
+        if start_date:
+            query["due_date"]["$gte"] = start_date
+        if end_date:
+            query["due_date"]["$lte"] = end_date
+    
+    return query
+
+def task_doc_to_dict(task_doc: dict) -> dict:
+    """Map a MongoDB task document to the fields of TaskResponse (in field order)"""
+    return {
+        "title": task_doc.get("title"),
+        "description": task_doc.get("description"),
+        "status": task_doc.get("status"),
+        "due_date": task_doc.get("due_date"),
+        "id": str(task_doc["_id"]),
+        "assigned_to": task_doc.get("assigned_to"),
+        "assigned_to_name": task_doc.get("assigned_to_name"),
+        "created_by": task_doc.get("created_by"),
+        "created_by_name": task_doc.get("created_by_name"),
+        "created_at": task_doc.get("created_at"),
+        "updated_at": task_doc.get("updated_at")
+    }
 
-@router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+def build_task_response(task_doc: dict) -> TaskResponse:
+    """Convert a MongoDB task document to TaskResponse"""
+    return TaskResponse(**task_doc_to_dict(task_doc))
+
+@router.post(
+    "",
+    response_model=TaskResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_user(TASK_WRITE_USER_LIMIT))]
+)
 async def create_task(
     task_data: TaskCreate,
     current_user: UserInDB = Depends(get_current_user)
@@ -43,9 +175,10 @@ async def create_task(
     assigned_to = task_data.assigned_to if task_data.assigned_to else current_user.id
     
     # Verify assigned user exists
+    assigned_user = None
     if assigned_to:
         try:
-            assigned_user = users_collection.find_one({"_id": ObjectId(assigned_to)})
+            assigned_user = await users_collection.find_one({"_id": ObjectId(assigned_to)})
             if not assigned_user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -57,7 +190,7 @@ async def create_task(
                 detail="Invalid user ID format"
             )
     
-    # Create task document
+    # Create task document (user names are stored with it, see app.denormalize)
     now = datetime.utcnow()
     task_doc = {
         "title": task_data.title,
@@ -65,38 +198,329 @@ async def create_task(
         "status": task_data.status,
         "due_date": task_data.due_date,
         "assigned_to": assigned_to,
+        "assigned_to_name": assigned_user["name"],
         "created_by": current_user.id,
+        "created_by_name": current_user.name,
         "created_at": now,
         "updated_at": now
     }
     
-    result = tasks_collection.insert_one(task_doc)
-    task_id = str(result.inserted_id)
-    
-    # Return task with user names
-    return TaskResponse(
-        id=task_id,
-        title=task_data.title,
-        description=task_data.description,
-        status=task_data.status,
-        due_date=task_data.due_date,
-        assigned_to=assigned_to,
-        assigned_to_name=get_user_name(assigned_to),
-        created_by=current_user.id,
-        created_by_name=current_user.name,
-        created_at=now,
-        updated_at=now
+    result = await tasks_collection.insert_one(task_doc)
+    await count_task_change(None, task_doc)
+    task_events.record_version(await bump_collection_version("tasks"))
+    
+    task_doc["_id"] = result.inserted_id
+    task_response = build_task_response(task_doc)
+    task_events.publish("created", task_response.model_dump())
+    
+    return task_response
+
+def plan_bulk_operation(
+    operation: TaskBulkOperation,
+    current_user: Principal,
+    tasks_by_id: Dict[str, dict],
+    existing_users: Dict[str, str],
+    now: datetime
+):
+    """
+    Check permissions for one bulk operation and build its write
+    
+    Applies the same rules as the single-task endpoints, using tasks and
+    users that were fetched up front for the whole batch.
+    
+    Returns:
+        Tuple of (task_id, pymongo write operation)
+    
+    Raises:
+        ValueError: With a user-facing message if the operation is rejected
+    """
+    if operation.action == TaskBulkAction.CREATE:
+        if operation.task is None:
+            raise ValueError("Missing task data")
+        
+        task_data = operation.task
+        if task_data.assigned_to and task_data.assigned_to != current_user.id:
+            if not can_assign_task(current_user.role):
+                raise ValueError("You don't have permission to assign tasks to others")
+        
+        assigned_to = task_data.assigned_to if task_data.assigned_to else current_user.id
+        if assigned_to not in existing_users:
+            raise ValueError("Assigned user not found")
+        
+        task_id = ObjectId()
+        return str(task_id), InsertOne({
+            "_id": task_id,
+            "title": task_data.title,
+            "description": task_data.description,
+            "status": task_data.status,
+            "due_date": task_data.due_date,
+            "assigned_to": assigned_to,
+            "assigned_to_name": existing_users[assigned_to],
+            "created_by": current_user.id,
+            "created_by_name": current_user.name,
+            "created_at": now,
+            "updated_at": now
+        })
+    
+    # Every other action targets an existing task
+    try:
+        task_id = ObjectId(operation.task_id)
+    except:
+        raise ValueError("Invalid task ID format")
+    
+    task_doc = tasks_by_id.get(str(task_id))
+    if task_doc is None:
+        raise ValueError("Task not found")
+    
+    if operation.action == TaskBulkAction.DELETE:
+        if not can_delete_task(current_user.role):
+            raise ValueError("Only admins can delete tasks")
+        return str(task_id), DeleteOne({"_id": task_id})
+    
+    if operation.action == TaskBulkAction.UPDATE_STATUS:
+        if operation.status is None:
+            raise ValueError("Missing status")
+        if current_user.role == "user" and task_doc.get("assigned_to") != current_user.id:
+            raise ValueError("You can only update your own tasks")
+        if current_user.role == "manager" and not can_edit_task(current_user.role, task_doc["created_by"], current_user.id):
+            raise ValueError("You can only edit tasks you created")
+        return str(task_id), UpdateOne(
+            {"_id": task_id},
+            {"$set": {"status": operation.status, "updated_at": now}}
+        )
+    
+    # Reassign
+    if not operation.assigned_to:
+        raise ValueError("Missing assigned_to")
+    if not can_assign_task(current_user.role):
+        raise ValueError("You don't have permission to reassign tasks")
+    if current_user.role == "manager" and not can_edit_task(current_user.role, task_doc["created_by"], current_user.id):
+        raise ValueError("You can only edit tasks you created")
+    if operation.assigned_to not in existing_users:
+        raise ValueError("Assigned user not found")
+    return str(task_id), UpdateOne(
+        {"_id": task_id},
+        {"$set": {
+            "assigned_to": operation.assigned_to,
+            "assigned_to_name": existing_users[operation.assigned_to],
+            "updated_at": now
+        }}
     )
 
-@router.get("", response_model=List[TaskResponse])
+def bulk_counter_changes(
+    operations: List[TaskBulkOperation],
+    results: List[TaskBulkResult],
+    tasks_by_id: Dict[str, dict],
+    current_user: Principal
+) -> CounterChanges:
+    """Task counter deltas of the successful operations of a bulk request"""
+    changes = CounterChanges()
+    for operation, result in zip(operations, results):
+        if not result.success:
+            continue
+        if operation.action == TaskBulkAction.CREATE:
+            changes.add({
+                "assigned_to": operation.task.assigned_to or current_user.id,
+                "status": operation.task.status
+            }, 1)
+            continue
+        
+        previous = tasks_by_id[result.task_id]
+        if operation.action == TaskBulkAction.DELETE:
+            changes.add(previous, -1)
+        elif operation.action == TaskBulkAction.UPDATE_STATUS:
+            changes.move(previous, {**previous, "status": operation.status})
+        else:
+            changes.move(previous, {**previous, "assigned_to": operation.assigned_to})
+    return changes
+
+async def publish_bulk_changes(
+    operations: List[TaskBulkOperation],
+    results: List[TaskBulkResult],
+    tasks_by_id: Dict[str, dict]
+):
+    """Notify live clients about the successful operations of a bulk request"""
+    written_ids = []
+    for operation, result in zip(operations, results):
+        if not result.success:
+            continue
+        if operation.action == TaskBulkAction.DELETE:
+            previous = tasks_by_id[result.task_id]
+            task_events.publish("deleted", {
+                "id": result.task_id,
+                "assigned_to": previous.get("assigned_to"),
+                "created_by": previous["created_by"]
+            })
+        else:
+            written_ids.append(ObjectId(result.task_id))
+    
+    if not written_ids:
+        return
+    
+    # Reload the written tasks so every event carries the full task
+    task_docs = await tasks_collection.find({"_id": {"$in": written_ids}}).to_list(length=None)
+    for task_doc in task_docs:
+        task_id = str(task_doc["_id"])
+        task = build_task_response(task_doc).model_dump()
+        previous = tasks_by_id.get(task_id)
+        if previous is None:
+            task_events.publish("created", task)
+        else:
+            task_events.publish("updated", task, previous.get("assigned_to"))
+
+@router.post(
+    "/bulk",
+    response_model=TaskBulkResponse,
+    dependencies=[Depends(limit_by_user(TASK_BULK_USER_LIMIT))]
+)
+async def bulk_tasks(
+    request: TaskBulkRequest,
+    current_user: UserInDB = Depends(get_current_user)
+):
+    """
+    Apply many task operations in one request
+    
+    - Actions: create, update_status, reassign, delete
+    - Each operation gets the same permission checks as the single-task endpoints
+    - Referenced tasks and users are fetched with one query each, and all
+      accepted operations are written with a single unordered bulk_write
+    - Returns one result per operation; a failed operation does not stop the others
+    - A task may appear in only one operation per request (400 otherwise)
+    """
+    operations = request.operations
+    results = [
+        TaskBulkResult(index=index, action=operation.action, success=False, task_id=operation.task_id)
+        for index, operation in enumerate(operations)
+    ]
+    
+    # Fetch every referenced task in one query. Several operations on one
+    # task would all be planned against its state before the request, and
+    # the unordered bulk_write applies them in no particular order
+    task_ids = set()
+    duplicate_ids = set()
+    for operation in operations:
+        if operation.action != TaskBulkAction.CREATE and operation.task_id and ObjectId.is_valid(operation.task_id):
+            task_id = ObjectId(operation.task_id)
+            if task_id in task_ids:
+                duplicate_ids.add(str(task_id))
+            task_ids.add(task_id)
+    if duplicate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Each task may appear in only one operation: {', '.join(sorted(duplicate_ids))}"
+        )
+    
+    tasks_by_id = {}
+    if task_ids:
+        task_cursor = tasks_collection.find(
+            {"_id": {"$in": list(task_ids)}},
+            {"assigned_to": 1, "created_by": 1, "status": 1}
+        )
+        tasks_by_id = {str(task_doc["_id"]): task_doc async for task_doc in task_cursor}
+    
+    # Check every user that tasks get assigned to in one query (and get their names)
+    assignee_ids = set()
+    for operation in operations:
+        if operation.action == TaskBulkAction.CREATE and operation.task:
+            assignee_ids.add(operation.task.assigned_to or current_user.id)
+        elif operation.action == TaskBulkAction.REASSIGN and operation.assigned_to:
+            assignee_ids.add(operation.assigned_to)
+    existing_users = await get_user_names(assignee_ids)
+    
+    # Check permissions in memory and collect the writes
+    now = datetime.utcnow()
+    writes = []
+    write_indexes = []
+    for index, operation in enumerate(operations):
+        try:
+            task_id, write = plan_bulk_operation(operation, current_user, tasks_by_id, existing_users, now)
+        except ValueError as e:
+            results[index].error = str(e)
+            continue
+        results[index].task_id = task_id
+        writes.append(write)
+        write_indexes.append(index)
+    
+    # Apply all accepted operations at once
+    write_errors = {}
+    if writes:
+        try:
+            await tasks_collection.bulk_write(writes, ordered=False)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+    
+    for write_position, index in enumerate(write_indexes):
+        if write_position in write_errors:
+            results[index].error = write_errors[write_position]
+        else:
+            results[index].success = True
+    
+    if any(result.success for result in results):
+        await apply_counter_changes(bulk_counter_changes(operations, results, tasks_by_id, current_user))
+        task_events.record_version(await bump_collection_version("tasks"))
+    
+    if task_events.has_subscribers:
+        await publish_bulk_changes(operations, results, tasks_by_id)
+    
+    succeeded = sum(1 for result in results if result.success)
+    return TaskBulkResponse(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    )
+
+@router.post(
+    "/import",
+    response_model=ImportResult,
+    dependencies=[Depends(limit_by_user(TASK_BULK_USER_LIMIT))]
+)
+async def import_tasks_file(
+    file: UploadFile = File(...),
+    import_format: Optional[FileFormat] = Query(None, alias="format"),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Import tasks from a CSV or NDJSON file (Admin only)
+    
+    - Fields: title, description, status, due_date, and the assignee as
+      assigned_to (user ID) or assigned_to_email (defaults to the admin)
+    - The format is `format` or, if omitted, the file extension
+    - Validated and inserted in chunks; valid rows are imported even if
+      others are rejected, and the rejected rows are returned with their
+      record numbers
+    - Also available as `python -m app.importer tasks`
+    """
+    file_format = import_format or detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format, pass format=csv or format=ndjson"
+        )
+    
+    try:
+        text = decode_upload(await file.read())
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    
+    return await import_tasks(text, file_format, current_user.id, current_user.name)
+
+@router.get("", response_model=List[Union[TaskResponse, TaskSparseResponse]])
 async def get_tasks(
+    request: Request,
+    response: Response,
     status: Optional[TaskStatus] = None,
     search: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal),
+    session: Optional[AsyncIOMotorClientSession] = Depends(list_read_session)
 ):
     """
     Get tasks with role-based filtering
@@ -105,83 +529,297 @@ async def get_tasks(
     - Manager: sees tasks they created or assigned to them
     - User: sees only tasks assigned to them
     
-    Supports filtering by status, search, and date range (for calendar)
+    Supports filtering by status, search, and date range (for calendar).
+    Search results are ranked by relevance and paged with skip only.
+    
+    Pagination: pass the X-Next-Cursor header of a full page as `cursor`
+    to fetch the next page (skip is ignored when a cursor is given).
+    
+    Sparse fields: `fields=id,status` returns only those fields (id is
+    always included), as described by TaskSparseResponse.
+    
+    User names are stored on the task documents, so no user lookup is needed.
+    
+    Supports conditional requests: a matching If-None-Match returns 304.
     """
-    # Build query based on role
-    query = {}
+    etag, not_modified = await check_etag(
+        request, ["tasks"], current_user.id, current_user.role, list_reads=True, session=session
+    )
+    if not_modified:
+        return not_modified_response(etag)
+    set_etag(response, etag)
     
-    if current_user.role == "user":
-        # Users only see their own tasks
-        query["assigned_to"] = current_user.id
-    elif current_user.role == "manager":
-        # Managers see tasks they created or assigned to them
-        query["$or"] = [
-            {"created_by": current_user.id},
-            {"assigned_to": current_user.id}
-        ]
-    # Admin sees all tasks (no additional filter)
+    try:
+        selected = parse_fields(fields, TASK_RESPONSE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Apply filters
-    if status:
-        query["status"] = status
+    query = build_task_query(current_user, status, search, start_date, end_date)
+    sort = TASK_SEARCH_SORT if search else TASK_LIST_SORT
     
-    if search:
-        # Search in title and description
-        query["$or"] = query.get("$or", [])
-        search_pattern = {"$regex": search, "$options": "i"}
-        if "$or" in query and isinstance(query["$or"], list):
-            # If we already have $or for role filtering, we need to combine differently
-            role_filter = query.pop("$or")
-            query["$and"] = [
-                {"$or": role_filter},
-                {"$or": [
-                    {"title": search_pattern},
-                    {"description": search_pattern}
-                ]}
-            ]
-        else:
-            query["$or"] = [
-                {"title": search_pattern},
-                {"description": search_pattern}
+    # Only read the requested fields (created_at is the cursor sort key)
+    projection = None
+    if selected is not None:
+        projection = build_projection(selected, TASK_FIELD_SOURCES, always=["created_at"])
+    
+    if cursor and search:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor pagination is not supported with search"
+        )
+    
+    # Keyset pagination: continue after the last task of the previous page
+    if cursor:
+        try:
+            keyset = created_at_keyset_query(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor"
+            )
+        query = {"$and": [query, keyset]} if query else keyset
+        skip = 0
+    
+    task_cursor = (
+        tasks_list_collection.find(query, projection, session=session)
+        .sort(sort)
+        .skip(skip)
+        .limit(limit)
+    )
+    task_docs = await task_cursor.to_list(length=limit)
+    
+    if len(task_docs) == limit and not search:
+        last_doc = task_docs[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_doc["_id"], last_doc["created_at"])
+    
+    return json_response(
+        [select_fields(task_doc_to_dict(task_doc), selected) for task_doc in task_docs],
+        response
+    )
+
+@router.get("/stats", response_model=TaskStats)
+async def get_task_stats(
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    session: Optional[AsyncIOMotorClientSession] = Depends(list_read_session)
+):
+    """
+    Get task statistics for the dashboard
+    
+    - Counts per status, overdue and due within the next 7 days
+    - Uses the same role-based visibility as the task list
+    - Computed in a single aggregation, without fetching task documents
+    - Supports conditional requests (If-None-Match)
+    """
+    # Overdue counts also move with the clock, so the ETag includes the minute
+    minute = datetime.utcnow().strftime("%Y%m%d%H%M")
+    etag, not_modified = await check_etag(
+        request, ["tasks"], current_user.id, current_user.role, minute, list_reads=True, session=session
+    )
+    if not_modified:
+        return not_modified_response(etag)
+    set_etag(response, etag)
+    
+    now = datetime.utcnow()
+    open_tasks = {"$ne": TaskStatus.COMPLETED.value}
+    
+    pipeline = [
+        {"$match": build_role_query(current_user)},
+        {"$facet": {
+            "by_status": [
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ],
+            "overdue": [
+                {"$match": {"status": open_tasks, "due_date": {"$lt": now}}},
+                {"$count": "count"}
+            ],
+            "due_this_week": [
+                {"$match": {
+                    "status": open_tasks,
+                    "due_date": {"$gte": now, "$lt": now + timedelta(days=7)}
+                }},
+                {"$count": "count"}
             ]
+        }}
+    ]
     
-    # Date range filter for calendar
-    if start_date or end_date:
-        query["due_date"] = {}
-        if start_date:
-            query["due_date"]["$gte"] = start_date
-        if end_date:
-            query["due_date"]["$lte"] = end_date
+    results = await tasks_list_collection.aggregate(pipeline, session=session).to_list(length=1)
+    facets = results[0] if results else {}
+    
+    stats = TaskStats()
+    for group in facets.get("by_status", []):
+        if group["_id"] in TaskStatus._value2member_map_:
+            setattr(stats, group["_id"], group["count"])
+        stats.total += group["count"]
+    
+    if facets.get("overdue"):
+        stats.overdue = facets["overdue"][0]["count"]
+    if facets.get("due_this_week"):
+        stats.due_this_week = facets["due_this_week"][0]["count"]
+    
+    return stats
+
+@router.get("/stream")
+async def stream_task_changes(current_user: Principal = Depends(get_current_principal_from_query)):
+    """
+    Stream task changes as Server-Sent Events
+    
+    - Events: created, updated, deleted (data is the task as JSON; deleted only has the id)
+    - Only changes to tasks the user can view are sent; a task that leaves
+      the user's view (e.g. reassigned) is sent as deleted
+    - A resync event tells the client to refetch its list; it is sent for
+      changes made through other workers (within TASK_EVENT_SYNC_SECONDS)
+    - Accepts the token as ?access_token= since EventSource cannot send headers
+    """
+    async def event_stream():
+        subscription = task_events.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if subscription.overflowed:
+                    # Events were dropped: discard the backlog and resync
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.overflowed = False
+                    yield "event: resync\ndata: {}\n\n"
+                
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if event is RESYNC_EVENT:
+                    yield "event: resync\ndata: {}\n\n"
+                    continue
+                
+                message = event_for_user(event, current_user)
+                if message:
+                    data = json.dumps(jsonable_encoder(message["task"]))
+                    yield f"event: {message['type']}\ndata: {data}\n\n"
+        finally:
+            task_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/calendar", response_model=List[TaskCalendarItem])
+async def get_calendar_tasks(
+    response: Response,
+    start_date: datetime,
+    end_date: datetime,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Get every visible task due within a date window (for calendar views)
+    
+    - Uses the same role-based visibility as the task list
+    - Returns a compact projection without a page limit
+    - The window may span at most 366 days
+    """
+    # Compare naive UTC datetimes, as stored by MongoDB
+    if start_date.tzinfo:
+        start_date = start_date.astimezone(timezone.utc).replace(tzinfo=None)
+    if end_date.tzinfo:
+        end_date = end_date.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    if end_date < start_date or end_date - start_date > MAX_CALENDAR_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date window must be positive and at most 366 days"
+        )
     
-    # Fetch tasks
-    tasks = []
-    cursor = tasks_collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    
-    for task_doc in cursor:
-        tasks.append(TaskResponse(
-            id=str(task_doc["_id"]),
-            title=task_doc["title"],
-            description=task_doc.get("description"),
-            status=task_doc["status"],
-            due_date=task_doc.get("due_date"),
-            assigned_to=task_doc.get("assigned_to"),
-            assigned_to_name=get_user_name(task_doc.get("assigned_to")),
-            created_by=task_doc["created_by"],
-            created_by_name=get_user_name(task_doc["created_by"]),
-            created_at=task_doc["created_at"],
-            updated_at=task_doc["updated_at"]
-        ))
-    
-    return tasks
+    query = build_task_query(current_user, start_date=start_date, end_date=end_date)
+    projection = {"title": 1, "status": 1, "due_date": 1, "assigned_to_name": 1}
+    
+    # Range scan on the due_date indexes, read in large batches
+    task_cursor = tasks_list_collection.find(query, projection).sort("due_date", 1).batch_size(1000)
+    task_docs = [task_doc async for task_doc in task_cursor]
+    
+    return json_response(
+        [
+            {
+                "id": str(task_doc["_id"]),
+                "title": task_doc["title"],
+                "status": task_doc["status"],
+                "due_date": task_doc["due_date"],
+                "assigned_to_name": task_doc.get("assigned_to_name")
+            }
+            for task_doc in task_docs
+        ],
+        response
+    )
+
+@router.get("/export")
+async def export_tasks(
+    export_format: FileFormat = Query(FileFormat.NDJSON, alias="format"),
+    status: Optional[TaskStatus] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Export every visible task as NDJSON or CSV, without a page limit
+    
+    - Uses the same role-based visibility as the task list, newest first
+    - `format=ndjson` (default) writes one task per line as in the task
+      list; `format=csv` writes a header row and one row per task
+    - `status` filters by status; `fields=id,title,status` picks the
+      exported fields (id is always included)
+    - Streams from one cursor in batches of EXPORT_BATCH_SIZE, so memory
+      stays flat however many tasks are exported
+    """
+    try:
+        selected = parse_fields(fields, TASK_RESPONSE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    query = build_task_query(current_user, status)
+    projection = None
+    if selected is not None:
+        projection = build_projection(selected, TASK_FIELD_SOURCES)
+    csv_encoder = CsvEncoder(selected or TASK_RESPONSE_FIELDS) if export_format == FileFormat.CSV else None
+    
+    async def export_stream():
+        task_cursor = (
+            tasks_list_collection.find(query, projection)
+            .sort(TASK_LIST_SORT)
+            .batch_size(EXPORT_BATCH_SIZE)
+        )
+        try:
+            if csv_encoder:
+                yield csv_encoder.header()
+            async for task_docs in iter_batches(task_cursor, EXPORT_BATCH_SIZE):
+                rows = [select_fields(task_doc_to_dict(task_doc), selected) for task_doc in task_docs]
+                yield csv_encoder.encode(rows) if csv_encoder else encode_ndjson(rows)
+        finally:
+            # Release the server-side cursor if the client disconnects early
+            await task_cursor.close()
+    
+    filename = f"tasks-{datetime.utcnow():%Y%m%d}.{export_format.value}"
+    return StreamingResponse(
+        export_stream(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
-    current_user: UserInDB = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get a specific task by ID"""
+    """Get a specific task by ID (supports If-None-Match)"""
+    etag, not_modified = await check_etag(request, ["tasks"], current_user.id, current_user.role)
+    if not_modified:
+        return not_modified_response(etag)
+    
     try:
-        task_doc = tasks_collection.find_one({"_id": ObjectId(task_id)})
+        task_doc = await tasks_collection.find_one({"_id": ObjectId(task_id)})
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -206,21 +844,14 @@ async def get_task(
             detail="You don't have permission to view this task"
         )
     
-    return TaskResponse(
-        id=str(task_doc["_id"]),
-        title=task_doc["title"],
-        description=task_doc.get("description"),
-        status=task_doc["status"],
-        due_date=task_doc.get("due_date"),
-        assigned_to=task_doc.get("assigned_to"),
-        assigned_to_name=get_user_name(task_doc.get("assigned_to")),
-        created_by=task_doc["created_by"],
-        created_by_name=get_user_name(task_doc["created_by"]),
-        created_at=task_doc["created_at"],
-        updated_at=task_doc["updated_at"]
-    )
+    set_etag(response, etag)
+    return build_task_response(task_doc)
 
-@router.put("/{task_id}", response_model=TaskResponse)
+@router.put(
+    "/{task_id}",
+    response_model=TaskResponse,
+    dependencies=[Depends(limit_by_user(TASK_WRITE_USER_LIMIT))]
+)
 async def update_task(
     task_id: str,
     task_update: TaskUpdate,
@@ -242,7 +873,7 @@ async def update_task(
         )
     
     # Fetch existing task
-    task_doc = tasks_collection.find_one({"_id": obj_id})
+    task_doc = await tasks_collection.find_one({"_id": obj_id})
     if not task_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -291,33 +922,46 @@ async def update_task(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to reassign tasks"
             )
+        assigned_names = await get_user_names([task_update.assigned_to])
+        if task_update.assigned_to not in assigned_names:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Assigned user not found"
+            )
         update_data["assigned_to"] = task_update.assigned_to
+        update_data["assigned_to_name"] = assigned_names[task_update.assigned_to]
     
-    # Update task
-    result = tasks_collection.find_one_and_update(
+    # Update task, reading the document as it was just before this write
+    # so the task counters move from exactly the status it replaced
+    previous = await tasks_collection.find_one_and_update(
         {"_id": obj_id},
         {"$set": update_data},
-        return_document=True
+        return_document=False
     )
+    if previous is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    result = {**previous, **update_data}
     
-    return TaskResponse(
-        id=str(result["_id"]),
-        title=result["title"],
-        description=result.get("description"),
-        status=result["status"],
-        due_date=result.get("due_date"),
-        assigned_to=result.get("assigned_to"),
-        assigned_to_name=get_user_name(result.get("assigned_to")),
-        created_by=result["created_by"],
-        created_by_name=get_user_name(result["created_by"]),
-        created_at=result["created_at"],
-        updated_at=result["updated_at"]
-    )
+    if "status" in update_data or "assigned_to" in update_data:
+        await count_task_change(previous, result)
+    task_events.record_version(await bump_collection_version("tasks"))
+    
+    task_response = build_task_response(result)
+    task_events.publish("updated", task_response.model_dump(), previous.get("assigned_to"))
+    
+    return task_response
 
-@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{task_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_by_user(TASK_WRITE_USER_LIMIT))]
+)
 async def delete_task(
     task_id: str,
-    current_user: UserInDB = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete a task (Admin only)"""
     try:
@@ -328,12 +972,23 @@ async def delete_task(
             detail="Invalid task ID format"
         )
     
-    result = tasks_collection.delete_one({"_id": obj_id})
+    deleted_task = await tasks_collection.find_one_and_delete(
+        {"_id": obj_id},
+        projection={"assigned_to": 1, "created_by": 1, "status": 1}
+    )
     
-    if result.deleted_count == 0:
+    if deleted_task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
+    await count_task_change(deleted_task, None)
+    task_events.record_version(await bump_collection_version("tasks"))
+    task_events.publish("deleted", {
+        "id": task_id,
+        "assigned_to": deleted_task.get("assigned_to"),
+        "created_by": deleted_task["created_by"]
+    })
+    
     return None
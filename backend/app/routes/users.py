@@ -1,12 +1,36 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from app.models.user import UserResponse, UserUpdate, UserInDB
-from app.database import users_collection
-from app.middleware.auth import get_current_user, require_admin
+from fastapi import APIRouter, HTTPException, status, Depends, File, Query, Request, Response, UploadFile
+from app.models.user import Principal, UserResponse, UserSparseResponse, UserUpdate, UserInDB, UserWorkload
+from app.models.imports import ImportResult
+from app.importer import decode_upload, detect_format, import_users
+from app.database import list_read_session, task_counters_list_collection, users_collection, users_list_collection
+from app.denormalize import schedule_name_fan_out
+from app.task_counters import get_task_counters
+from app.middleware.auth import get_current_user, require_admin, invalidate_user_sessions
+from app.utils.etag import bump_collection_version, check_etag, not_modified_response, set_etag
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, id_keyset_query
+from app.utils.serialization import json_response
+from app.utils.projection import parse_fields, build_projection, select_fields
+from app.utils.export import FileFormat
+from app.utils.security import PasswordHasherBusy, hash_passwords_async
 from bson import ObjectId
-from typing import List
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from typing import List, Optional, Union
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
+# Fields that can be requested with ?fields= on the user list
+USER_RESPONSE_FIELDS = list(UserResponse.model_fields)
+
+def user_doc_to_dict(user_doc: dict) -> dict:
+    """Map a MongoDB user document to the fields of UserResponse (in field order)"""
+    return {
+        "name": user_doc.get("name"),
+        "email": user_doc.get("email"),
+        "role": user_doc.get("role"),
+        "id": str(user_doc["_id"]),
+        "created_at": user_doc.get("created_at")
+    }
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: UserInDB = Depends(get_current_user)):
     """Get current user's information"""
@@ -18,40 +42,186 @@ async def get_current_user_info(current_user: UserInDB = Depends(get_current_use
         created_at=current_user.created_at
     )
 
-@router.get("", response_model=List[UserResponse])
+@router.get("", response_model=List[Union[UserResponse, UserSparseResponse]])
 async def get_users(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: UserInDB = Depends(require_admin)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(require_admin),
+    session: Optional[AsyncIOMotorClientSession] = Depends(list_read_session)
 ):
     """
     Get all users (Admin only)
     
     - Supports pagination with skip and limit
+    - Supports keyset pagination: pass the X-Next-Cursor header of a full
+      page as `cursor` (skip is ignored when a cursor is given)
     - Returns list of users without passwords
+    - Sparse fields: `fields=id,name` returns only those fields (id is always
+      included), as described by UserSparseResponse
+    - Supports conditional requests (If-None-Match)
     """
-    users = []
-    cursor = users_collection.find().skip(skip).limit(limit)
-    
-    for user_doc in cursor:
-        users.append(UserResponse(
-            id=str(user_doc["_id"]),
-            name=user_doc["name"],
-            email=user_doc["email"],
-            role=user_doc["role"],
-            created_at=user_doc["created_at"]
-        ))
-    
-    return users
+    etag, not_modified = await check_etag(request, ["users"], list_reads=True, session=session)
+    if not_modified:
+        return not_modified_response(etag)
+    set_etag(response, etag)
+    
+    try:
+        selected = parse_fields(fields, USER_RESPONSE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    projection = {"hashed_password": 0}
+    if selected is not None:
+        projection = build_projection(selected, {"id": "_id"})
+    
+    query = {}
+    if cursor:
+        try:
+            query = id_keyset_query(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        skip = 0
+    
+    user_cursor = (
+        users_list_collection.find(query, projection, session=session)
+        .sort("_id", 1)
+        .skip(skip)
+        .limit(limit)
+    )
+    user_docs = await user_cursor.to_list(length=limit)
+    
+    if len(user_docs) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(user_docs[-1]["_id"])
+    
+    return json_response(
+        [select_fields(user_doc_to_dict(user_doc), selected) for user_doc in user_docs],
+        response
+    )
+
+@router.post("/import", response_model=ImportResult)
+async def import_users_file(
+    file: UploadFile = File(...),
+    import_format: Optional[FileFormat] = Query(None, alias="format"),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Import users from a CSV or NDJSON file (Admin only)
+    
+    - Fields: name, email, password and optionally role
+    - The format is `format` or, if omitted, the file extension
+    - Passwords are hashed on the shared password hashing pool, using at
+      most half of it so logins keep working; registered or repeated
+      emails are rejected before hashing
+    - Returns the rejected rows with their record numbers
+    - Also available as `python -m app.importer users`
+    """
+    file_format = import_format or detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format, pass format=csv or format=ndjson"
+        )
+    
+    try:
+        text = decode_upload(await file.read())
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    
+    try:
+        return await import_users(text, file_format, hash_passwords_async)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hashing is saturated, retry the import shortly (already imported rows are reported as duplicates)",
+            headers={"Retry-After": "5"}
+        )
+
+@router.get("/workload", response_model=List[UserWorkload])
+async def get_user_workload(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(require_admin),
+    session: Optional[AsyncIOMotorClientSession] = Depends(list_read_session)
+):
+    """
+    Get the task counts per status of every user (Admin only)
+    
+    - Read from the per-user task counters (see app.task_counters), so the
+      cost depends on the page size, not on the number of tasks
+    - Paged like the user list: pass the X-Next-Cursor header of a full
+      page as `cursor`
+    - Supports conditional requests (If-None-Match)
+    """
+    etag, not_modified = await check_etag(
+        request, ["users", "tasks", "task_counters"], list_reads=True, session=session
+    )
+    if not_modified:
+        return not_modified_response(etag)
+    set_etag(response, etag)
+    
+    query = {}
+    if cursor:
+        try:
+            query = id_keyset_query(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    user_cursor = (
+        users_list_collection.find(query, {"name": 1, "role": 1}, session=session)
+        .sort("_id", 1)
+        .limit(limit)
+    )
+    user_docs = await user_cursor.to_list(length=limit)
+    
+    if len(user_docs) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(user_docs[-1]["_id"])
+    
+    counters = await get_task_counters(
+        [str(user_doc["_id"]) for user_doc in user_docs],
+        task_counters_list_collection,
+        session
+    )
+    
+    workload = []
+    for user_doc in user_docs:
+        user_id = str(user_doc["_id"])
+        counts = counters[user_id]
+        workload.append({
+            "id": user_id,
+            "name": user_doc["name"],
+            "role": user_doc["role"],
+            **counts,
+            "total": sum(counts.values())
+        })
+    
+    return json_response(workload, response)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    current_user: UserInDB = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Get specific user by ID (Admin only)"""
     try:
-        user_doc = users_collection.find_one({"_id": ObjectId(user_id)})
+        user_doc = await users_collection.find_one({"_id": ObjectId(user_id)})
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,13 +246,14 @@ async def get_user(
 async def update_user(
     user_id: str,
     user_update: UserUpdate,
-    current_user: UserInDB = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """
     Update user information (Admin only)
     
     - Can update name and role
     - Cannot update email or password through this endpoint
+    - A new name is copied to the user's tasks in the background
     """
     try:
         obj_id = ObjectId(user_id)
@@ -106,7 +277,7 @@ async def update_user(
         )
     
     # Update user
-    result = users_collection.find_one_and_update(
+    result = await users_collection.find_one_and_update(
         {"_id": obj_id},
         {"$set": update_data},
         return_document=True
@@ -118,6 +289,11 @@ async def update_user(
             detail="User not found"
         )
     
+    await invalidate_user_sessions(user_id)
+    await bump_collection_version("users")
+    if user_update.name is not None:
+        schedule_name_fan_out(user_id)
+    
     return UserResponse(
         id=str(result["_id"]),
         name=result["name"],
@@ -129,7 +305,7 @@ async def update_user(
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: str,
-    current_user: UserInDB = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete a user (Admin only)"""
     try:
@@ -147,7 +323,7 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    result = users_collection.delete_one({"_id": obj_id})
+    result = await users_collection.delete_one({"_id": obj_id})
     
     if result.deleted_count == 0:
         raise HTTPException(
@@ -155,4 +331,8 @@ async def delete_user(
             detail="User not found"
         )
     
+    await invalidate_user_sessions(user_id)
+    await bump_collection_version("users")
+    schedule_name_fan_out(user_id)
+    
     return None
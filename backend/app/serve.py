@@ -0,0 +1,243 @@
+"""
+Production server: several uvicorn workers sharing one listening socket
+
+The master process imports the app once, binds the socket and then forks
+the workers, so every worker starts from an already imported app instead
+of paying the import cost again. Each worker creates its own MongoDB
+client on first use (see app.database), runs the app lifespan and accepts
+connections from the shared socket.
+
+The master restarts workers that exit unexpectedly. On SIGTERM or SIGINT
+it forwards SIGTERM to every worker; each one stops accepting connections
+and finishes its in-flight requests within the graceful timeout, after
+which any worker still running is killed.
+
+Where fork() is not available (Windows) this falls back to uvicorn's own
+multi-process mode, which starts every worker from scratch.
+
+Usage (from the backend directory):
+    python -m app.serve                       # one worker per available CPU
+    python -m app.serve --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import math
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+import uvicorn
+from app.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# A worker that exits sooner than this after starting counts as failing
+# on startup; after MAX_STARTUP_FAILURES in a row the server gives up
+MIN_WORKER_UPTIME_SECONDS = 5
+MAX_STARTUP_FAILURES = 5
+
+# Exit code of a worker whose app failed to start (same as uvicorn's)
+STARTUP_FAILURE = 3
+
+def available_cpus() -> int:
+    """
+    CPUs this process may use
+    
+    Takes the CPU affinity mask and, in containers, the cgroup CPU quota
+    into account, so a container limited to 2 CPUs on a 64-core host
+    gets 2 workers rather than 64.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    
+    quota = None
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            limit, period = cpu_max.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: a quota of -1 means unlimited
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as quota_file:
+                limit = int(quota_file.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as period_file:
+                period = int(period_file.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    
+    if quota:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+def default_workers() -> int:
+    """Worker count from settings.serve_workers, or one per available CPU"""
+    return settings.serve_workers or available_cpus()
+
+def preload():
+    """
+    Import the app and everything it loads lazily, before forking
+    
+    Returns:
+        The ASGI app
+    """
+    from app.main import app
+    from app.utils.security import pwd_context
+    
+    # passlib picks its bcrypt backend on the first hash
+    pwd_context.handler().get_backend()
+    return app
+
+def run_worker(config: uvicorn.Config, sock: socket.socket):
+    """Serve in a forked worker process; never returns"""
+    exit_code = 1
+    try:
+        # The master's handlers are inherited; uvicorn installs its own
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        gc.enable()
+        
+        server = uvicorn.Server(config)
+        server.run(sockets=[sock])
+        exit_code = 0 if server.started else STARTUP_FAILURE
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        # Skip the master's atexit handlers and buffered output
+        os._exit(exit_code)
+
+class WorkerSupervisor:
+    """Forks the workers, restarts the ones that die and stops them gracefully"""
+    
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int, graceful_timeout: int):
+        self.config = config
+        self.sock = sock
+        self.worker_count = workers
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}  # pid -> start time
+        self.stopping = False
+        self.exit_code = 0
+    
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.config, self.sock)
+        self.workers[pid] = time.monotonic()
+    
+    def signal_workers(self, signum: int):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    def stop(self, signum=None, frame=None):
+        """Ask every worker to finish its requests and exit"""
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Stopping %d workers (up to %ds)", len(self.workers), self.graceful_timeout)
+        self.signal_workers(signal.SIGTERM)
+        signal.alarm(self.graceful_timeout + 1)
+    
+    def kill(self, signum=None, frame=None):
+        """Kill the workers that outlived the graceful timeout"""
+        logger.warning("Killing %d workers after the graceful timeout", len(self.workers))
+        self.signal_workers(signal.SIGKILL)
+    
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGALRM, self.kill)
+        
+        # Keep the preloaded objects out of the collector so that it does
+        # not touch (and copy) their memory pages in every worker
+        gc.disable()
+        gc.freeze()
+        for _ in range(self.worker_count):
+            self.spawn()
+        logger.info("Started %d workers", self.worker_count)
+        
+        startup_failures = 0
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started_at = self.workers.pop(pid, None)
+            if started_at is None or self.stopping:
+                continue
+            
+            exit_code = os.waitstatus_to_exitcode(status)
+            if exit_code == STARTUP_FAILURE or time.monotonic() - started_at < MIN_WORKER_UPTIME_SECONDS:
+                startup_failures += 1
+            else:
+                startup_failures = 0
+            if startup_failures >= MAX_STARTUP_FAILURES:
+                logger.error("Workers keep failing on startup, shutting down")
+                self.exit_code = 1
+                self.stop()
+                continue
+            
+            logger.warning("Worker %d exited with code %d, starting a new one", pid, exit_code)
+            time.sleep(startup_failures)
+            if not self.stopping:
+                self.spawn()
+        
+        signal.alarm(0)
+        logger.info("All workers stopped")
+        return self.exit_code
+
+def serve(host: str, port: int, workers: int, graceful_timeout: int, log_level: str) -> int:
+    if not hasattr(os, "fork"):
+        logger.warning("fork() is not available, workers will not share the preloaded app")
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            log_level=log_level,
+            timeout_graceful_shutdown=graceful_timeout
+        )
+        return 0
+    
+    config = uvicorn.Config(
+        preload(),
+        host=host,
+        port=port,
+        log_level=log_level,
+        lifespan="on",
+        timeout_graceful_shutdown=graceful_timeout
+    )
+    sock = config.bind_socket()
+    try:
+        return WorkerSupervisor(config, sock, workers, graceful_timeout).run()
+    finally:
+        sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Worker processes (default: one per available CPU)")
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=settings.serve_graceful_timeout_seconds,
+        help="Seconds workers get to finish their requests on shutdown"
+    )
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    args = parser.parse_args()
+    
+    sys.exit(serve(args.host, args.port, max(1, args.workers), args.graceful_timeout, args.log_level))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Per-user task counters
+
+The task_counters collection holds one document per assignee with the
+number of tasks they have in each status:
+
+    {"_id": "<user id>", "todo": 3, "in_progress": 1, "completed": 12}
+
+The task routes adjust it with $inc after every create, status change,
+reassignment and delete, so per-user workload is read from one small
+document per user instead of scanning tasks. Counter updates are not in
+the same transaction as the task writes, so a crash or a concurrent bulk
+write can leave them slightly off; the reconciliation job recounts from
+the tasks and rewrites the counters that differ.
+
+Usage (from the backend directory):
+    python -m app.task_counters            # report users whose counters are off
+    python -m app.task_counters --repair   # rewrite them (also the initial backfill)
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, Iterable, Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import UpdateOne
+from app.database import CollectionProxy, close_db, task_counters_collection, tasks_collection
+from app.models.task import TaskStatus
+from app.utils.etag import bump_collection_version
+
+# Statuses counted per user (one field each on the counter documents)
+COUNTED_STATUSES = [task_status.value for task_status in TaskStatus]
+
+class CounterChanges:
+    """Counter deltas collected over one or more task writes, applied in one bulk write"""
+    
+    def __init__(self):
+        self.deltas: Dict[str, Dict[str, int]] = {}
+    
+    def add(self, task_doc: Optional[dict], delta: int):
+        """Count a task (delta=1) or stop counting it (delta=-1) for its assignee"""
+        if not task_doc or not task_doc.get("assigned_to") or task_doc.get("status") is None:
+            return
+        task_status = TaskStatus(task_doc["status"]).value
+        user_deltas = self.deltas.setdefault(task_doc["assigned_to"], {})
+        user_deltas[task_status] = user_deltas.get(task_status, 0) + delta
+    
+    def move(self, before: Optional[dict], after: Optional[dict]):
+        """Record a task going from one (assignee, status) to another"""
+        self.add(before, -1)
+        self.add(after, 1)
+
+async def apply_counter_changes(changes: CounterChanges):
+    """Apply the collected deltas with one $inc per affected user"""
+    writes = []
+    for user_id, user_deltas in changes.deltas.items():
+        increments = {task_status: delta for task_status, delta in user_deltas.items() if delta}
+        if increments:
+            writes.append(UpdateOne({"_id": user_id}, {"$inc": increments}, upsert=True))
+    
+    if writes:
+        await task_counters_collection.bulk_write(writes, ordered=False)
+
+async def count_task_change(before: Optional[dict], after: Optional[dict]):
+    """Adjust the counters for a single created, updated or deleted task"""
+    changes = CounterChanges()
+    changes.move(before, after)
+    await apply_counter_changes(changes)
+
+def counter_values(counter_doc: Optional[dict]) -> Dict[str, int]:
+    """Status counts of a counter document (missing statuses count as 0)"""
+    counter_doc = counter_doc or {}
+    return {task_status: counter_doc.get(task_status, 0) for task_status in COUNTED_STATUSES}
+
+async def count_tasks_by_assignee() -> Dict[str, Dict[str, int]]:
+    """Count every assignee's tasks per status from the tasks themselves (scans tasks)"""
+    pipeline = [
+        {"$match": {"assigned_to": {"$ne": None}}},
+        {"$group": {"_id": {"user": "$assigned_to", "status": "$status"}, "count": {"$sum": 1}}}
+    ]
+    counts: Dict[str, Dict[str, int]] = {}
+    async for group in tasks_collection.aggregate(pipeline):
+        task_status = group["_id"]["status"]
+        if task_status in COUNTED_STATUSES:
+            user_counts = counts.setdefault(group["_id"]["user"], counter_values(None))
+            user_counts[task_status] = group["count"]
+    return counts
+
+async def reconcile_task_counters(repair: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Compare the counters with a recount of the tasks
+    
+    Tasks written while the recount runs can make a repaired counter
+    slightly off again; run it at a quiet time, or simply again.
+    
+    Args:
+        repair: Overwrite the counters that differ with the recounted values
+    
+    Returns:
+        Recounted values of every user whose counters differed
+    """
+    actual = await count_tasks_by_assignee()
+    
+    stored = {}
+    async for counter_doc in task_counters_collection.find({}):
+        stored[counter_doc["_id"]] = counter_values(counter_doc)
+    
+    drifted = {}
+    for user_id in set(actual) | set(stored):
+        expected = actual.get(user_id, counter_values(None))
+        if stored.get(user_id, counter_values(None)) != expected:
+            drifted[user_id] = expected
+    
+    if repair and drifted:
+        await task_counters_collection.bulk_write(
+            [
+                UpdateOne({"_id": user_id}, {"$set": expected}, upsert=True)
+                for user_id, expected in drifted.items()
+            ],
+            ordered=False
+        )
+        # Routine counter updates come with a tasks version bump; repairs do not
+        await bump_collection_version("task_counters")
+    return drifted
+
+async def get_task_counters(
+    user_ids: Iterable[str],
+    collection: CollectionProxy = task_counters_collection,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> Dict[str, Dict[str, int]]:
+    """Status counts of several users with one query (users without tasks get zeros)"""
+    user_ids = list(user_ids)
+    counters = {user_id: counter_values(None) for user_id in user_ids}
+    async for counter_doc in collection.find({"_id": {"$in": user_ids}}, session=session):
+        counters[counter_doc["_id"]] = counter_values(counter_doc)
+    return counters
+
+async def reconcile(repair: bool):
+    start = time.perf_counter()
+    try:
+        drifted = await reconcile_task_counters(repair)
+    finally:
+        close_db()
+    
+    action = "Repaired" if repair else "Found"
+    print(f"{action} {len(drifted)} users with drifted task counters ({time.perf_counter() - start:.2f}s)")
+    if not repair and drifted:
+        print("Run python -m app.task_counters --repair to fix them")
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile the per-user task counters")
+    parser.add_argument("--repair", action="store_true", help="Rewrite drifted counters instead of only reporting them")
+    args = parser.parse_args()
+    
+    asyncio.run(reconcile(args.repair))
+
+if __name__ == "__main__":
+    main()
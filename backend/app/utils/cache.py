@@ -0,0 +1,71 @@
+"""In-process caching helpers"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after a fixed time-to-live
+    
+    Entries are evicted least-recently-used first once max_size is reached.
+    The cache is local to one worker process, so writers must call
+    invalidate() for the keys they change; the TTL bounds how stale other
+    workers can be.
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
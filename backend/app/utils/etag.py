@@ -0,0 +1,98 @@
+"""ETag helpers for conditional GET requests"""
+import hashlib
+from typing import Dict, Iterable, Optional
+from fastapi import Request, Response, status
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument
+from app.database import CollectionProxy, versions_collection, versions_list_collection
+
+async def bump_collection_version(name: str) -> int:
+    """
+    Record that a collection changed (called after every write to it)
+    
+    Returns:
+        The new version of the collection
+    """
+    version_doc = await versions_collection.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return version_doc["version"]
+
+async def get_collection_versions(
+    names: Iterable[str],
+    collection: CollectionProxy = versions_collection,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> Dict[str, int]:
+    """Read the current version of several collections with one query"""
+    names = list(names)
+    cursor = collection.find({"_id": {"$in": names}}, session=session)
+    versions = {name: 0 for name in names}
+    async for version_doc in cursor:
+        versions[version_doc["_id"]] = version_doc["version"]
+    return versions
+
+def make_etag(versions: Dict[str, int], *parts) -> str:
+    """Build a weak ETag from collection versions and whatever scopes the response"""
+    key = "|".join(
+        [f"{name}:{versions[name]}" for name in sorted(versions)] + [str(part) for part in parts]
+    )
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+async def check_etag(
+    request: Request,
+    collections: Iterable[str],
+    *parts,
+    list_reads: bool = False,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> tuple[str, bool]:
+    """
+    Compute the ETag of a GET response before doing any of its work
+    
+    The ETag covers the request path and query string, the versions of the
+    collections the response reads, and any extra parts (e.g. the user).
+    
+    Responses built from list reads pass list_reads=True and the session
+    from list_read_session, and read their data in that session too. The
+    versions and the data may come from different replica set members;
+    the session makes the data reads wait until they are at least as
+    recent as the versions, so stale rows are never cached under a newer
+    ETag.
+    
+    Returns:
+        Tuple of (etag, not_modified); not_modified is True when the
+        client's If-None-Match already matches
+    """
+    versions = await get_collection_versions(
+        collections,
+        versions_list_collection if list_reads else versions_collection,
+        session
+    )
+    etag = make_etag(versions, request.url.path, request.url.query, *parts)
+    return etag, etag_matches(request.headers.get("if-none-match"), etag)
+
+# Let clients store responses but always revalidate them with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+def set_etag(response: Response, etag: str):
+    """Attach the ETag and revalidation headers to a response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified_response(etag: str) -> Response:
+    """Empty 304 response for a matching If-None-Match"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,152 @@
+"""Task change notifications for live clients"""
+import asyncio
+import logging
+from typing import Optional
+from app.config import settings
+from app.models.user import Principal
+from app.utils.etag import get_collection_versions
+from app.utils.permissions import can_view_task
+
+logger = logging.getLogger(__name__)
+
+# Sent in place of the changes a worker cannot describe
+RESYNC_EVENT = {"type": "resync"}
+
+class TaskEventSubscription:
+    """Bounded queue of task events for one connected client"""
+    
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+class TaskEventBus:
+    """
+    Fan-out of task changes to the clients connected to this worker
+    
+    The task routes publish every create, update and delete they handle.
+    Writes made through other workers (or by imports and name backfills)
+    are detected from the "tasks" collection version, which every task
+    write bumps: when it advances past the versions this worker recorded
+    for its own writes, subscribers get a resync event and refetch.
+    """
+    
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscriptions: set[TaskEventSubscription] = set()
+        self.version: Optional[int] = None  # "tasks" version at the last check
+        self._local_versions: set[int] = set()
+    
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+    
+    def subscribe(self) -> TaskEventSubscription:
+        subscription = TaskEventSubscription(self.max_queue)
+        self._subscriptions.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: TaskEventSubscription):
+        self._subscriptions.discard(subscription)
+    
+    def record_version(self, version: int):
+        """Remember a "tasks" version produced by a write this worker published"""
+        if self.version is not None:
+            self._local_versions.add(version)
+    
+    def check_version(self, version: int):
+        """
+        Compare the current "tasks" version with the last one checked
+        
+        Sends a resync event if any version in between was not produced by
+        this worker. A local write whose version is read before it is
+        recorded causes an unneeded resync, never a missed one.
+        """
+        previous, self.version = self.version, version
+        local = self._local_versions
+        self._local_versions = {local_version for local_version in local if local_version > version}
+        if previous is None or version <= previous:
+            return
+        local_writes = sum(1 for local_version in local if previous < local_version <= version)
+        if local_writes < version - previous:
+            self.resync()
+    
+    def resync(self):
+        """Ask every subscriber to refetch its list"""
+        for subscription in self._subscriptions:
+            try:
+                subscription.queue.put_nowait(RESYNC_EVENT)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+    
+    def publish(self, event_type: str, task: dict, previous_assigned_to: Optional[str] = None):
+        """
+        Queue a task change for every subscriber
+        
+        Args:
+            event_type: "created", "updated" or "deleted"
+            task: Task as returned by the API (must include id, assigned_to and created_by)
+            previous_assigned_to: Assignee before an update, used to tell
+                clients that a task has left their view
+        """
+        event = {
+            "type": event_type,
+            "task": task,
+            "previous_assigned_to": previous_assigned_to
+        }
+        for subscription in self._subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop events and ask it to refetch instead
+                subscription.overflowed = True
+
+def event_for_user(event: dict, user: Principal) -> Optional[dict]:
+    """
+    Translate a task event into what a given user is allowed to see
+    
+    Returns:
+        Dict with "type" and "task" keys, or None if the user should not be notified
+    """
+    task = event["task"]
+    visible_now = can_view_task(user.role, task.get("assigned_to"), task.get("created_by"), user.id)
+    
+    if event["type"] == "deleted":
+        if visible_now:
+            return {"type": "deleted", "task": {"id": task["id"]}}
+        return None
+    
+    if event["type"] == "created":
+        return {"type": "created", "task": task} if visible_now else None
+    
+    visible_before = can_view_task(
+        user.role,
+        event["previous_assigned_to"],
+        task.get("created_by"),
+        user.id
+    )
+    if visible_now:
+        return {"type": "updated" if visible_before else "created", "task": task}
+    if visible_before:
+        return {"type": "deleted", "task": {"id": task["id"]}}
+    return None
+
+# Shared event bus for this worker
+task_events = TaskEventBus()
+
+async def sync_task_events():
+    """Check the "tasks" version for writes made outside this worker"""
+    if not task_events.has_subscribers:
+        # Clients fetch their list when they connect; start over then
+        task_events.version = None
+        return
+    versions = await get_collection_versions(["tasks"])
+    task_events.check_version(versions["tasks"])
+
+async def run_task_event_sync():
+    """Background task relaying other workers' task writes to this worker's streams"""
+    while True:
+        try:
+            await sync_task_events()
+        except Exception:
+            logger.exception("Task event sync failed")
+        await asyncio.sleep(settings.task_event_sync_seconds)
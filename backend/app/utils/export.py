@@ -0,0 +1,74 @@
+"""Streaming NDJSON and CSV encoding for export endpoints"""
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, List
+from app.utils.serialization import dumps
+
+class FileFormat(str, Enum):
+    """Export and import file format"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+MEDIA_TYPES = {
+    FileFormat.NDJSON: "application/x-ndjson",
+    FileFormat.CSV: "text/csv",
+}
+
+# Leading characters that make spreadsheet applications evaluate a cell
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+async def iter_batches(cursor, batch_size: int) -> AsyncIterator[List[dict]]:
+    """Group the documents of a cursor into lists of at most batch_size"""
+    batch = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def encode_ndjson(rows: List[dict]) -> bytes:
+    """
+    Encode rows as newline-delimited JSON, one object per line
+    
+    Uses the same untyped encoder as json_response, so the rows must be
+    built with exactly the fields to export (see serialization.dumps).
+    """
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+def csv_value(value):
+    """Format one value for a CSV cell"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        # Keep user-entered text from running as a spreadsheet formula
+        return "'" + value
+    return value
+
+class CsvEncoder:
+    """Encodes rows of a fixed set of fields as CSV, one chunk at a time"""
+    
+    def __init__(self, fields: List[str]):
+        self.fields = fields
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+    
+    def header(self) -> bytes:
+        return self._encode([self.fields])
+    
+    def encode(self, rows: List[dict]) -> bytes:
+        return self._encode([[csv_value(row[field]) for field in self.fields] for row in rows])
+    
+    def _encode(self, rows: List[list]) -> bytes:
+        self._writer.writerows(rows)
+        chunk = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return chunk.encode()
@@ -0,0 +1,188 @@
+"""Request and MongoDB metrics, exposed in Prometheus text format"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from pymongo import monitoring
+
+# Prometheus client default buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Every Counter and Histogram, in the order they are rendered
+registry: List = []
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set, escaping values"""
+    parts = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+    
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[tuple, float] = {}
+        self._lock = Lock()
+        registry.append(self)
+    
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(self.label_names, labels)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative bucket histogram with a fixed set of label names"""
+    
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = Lock()
+        registry.append(self)
+    
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    bucket_labels = format_labels(self.label_names, labels, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                label_text = format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{label_text} {total}")
+                lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# HTTP metrics (recorded by app.middleware.metrics)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    ("method", "route", "status")
+)
+http_request_mongo_commands = Histogram(
+    "http_request_mongo_commands",
+    "MongoDB commands issued per HTTP request",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS
+)
+http_request_mongo_duration = Counter(
+    "http_request_mongo_duration_seconds_total",
+    "Time spent in MongoDB commands while handling HTTP requests",
+    ("method", "route")
+)
+
+# MongoDB metrics (recorded by MongoCommandListener)
+mongo_command_duration = Histogram(
+    "mongodb_command_duration_seconds",
+    "Round-trip time of MongoDB commands",
+    ("command", "collection")
+)
+mongo_command_failures = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ("command", "collection")
+)
+
+class RequestStats:
+    """MongoDB commands issued while handling one request"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (command, collection, seconds); appended from Motor's executor threads
+        self.commands: List[Tuple[str, str, float]] = []
+    
+    @property
+    def mongo_seconds(self) -> float:
+        return sum(seconds for _, _, seconds in self.commands)
+    
+    def breakdown(self) -> str:
+        """Commands grouped by name and collection, slowest first, e.g. "find users x12 (34.1 ms)" """
+        groups: Dict[str, list] = {}
+        for command, collection, seconds in self.commands:
+            group = groups.setdefault(f"{command} {collection}".strip(), [0, 0.0])
+            group[0] += 1
+            group[1] += seconds
+        return ", ".join(
+            f"{name} x{count} ({seconds * 1000:.1f} ms)"
+            for name, (count, seconds) in sorted(groups.items(), key=lambda item: -item[1][1])
+        )
+
+# Stats of the request being handled in the current context (None outside requests).
+# Motor copies the context into its executor, so the listener sees it too.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Records every MongoDB command and attributes it to the current request
+    
+    Registered on the client in app.database.connect_db.
+    """
+    
+    def __init__(self):
+        # (connection, request id) -> (command, collection) for in-flight commands
+        self._in_flight: Dict[tuple, Tuple[str, str]] = {}
+    
+    def started(self, event: monitoring.CommandStartedEvent):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        self._in_flight[(event.connection_id, event.request_id)] = (event.command_name, collection)
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._record(event, failed=False)
+    
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._record(event, failed=True)
+    
+    def _record(self, event, failed: bool):
+        labels = self._in_flight.pop((event.connection_id, event.request_id), (event.command_name, ""))
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(labels, seconds)
+        if failed:
+            mongo_command_failures.inc(labels)
+        
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.commands.append((labels[0], labels[1], seconds))
+
+command_listener = MongoCommandListener()
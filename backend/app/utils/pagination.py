@@ -0,0 +1,60 @@
+"""Helpers for keyset (cursor) pagination"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from bson import ObjectId
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(object_id: ObjectId, created_at: Optional[datetime] = None) -> str:
+    """
+    Encode the sort key of the last item on a page as an opaque cursor
+    
+    Args:
+        object_id: _id of the last document on the page
+        created_at: created_at of the last document (for lists sorted by it)
+    
+    Returns:
+        URL-safe cursor string
+    """
+    data = {"id": str(object_id)}
+    if created_at is not None:
+        data["t"] = created_at.isoformat()
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[ObjectId, Optional[datetime]]:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Returns:
+        Tuple of (_id, created_at); created_at is None if it was not encoded
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        object_id = ObjectId(data["id"])
+        created_at = datetime.fromisoformat(data["t"]) if "t" in data else None
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return object_id, created_at
+
+def created_at_keyset_query(cursor: str) -> dict:
+    """Query matching documents after the cursor when sorted by (created_at, _id) descending"""
+    object_id, created_at = decode_cursor(cursor)
+    if created_at is None:
+        raise ValueError("Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": object_id}}
+    ]}
+
+def id_keyset_query(cursor: str) -> dict:
+    """Query matching documents after the cursor when sorted by _id ascending"""
+    object_id, _ = decode_cursor(cursor)
+    return {"_id": {"$gt": object_id}}
@@ -0,0 +1,51 @@
+"""Helpers for sparse field selection (?fields=) on list endpoints"""
+from typing import Dict, Iterable, List, Optional
+
+def parse_fields(fields: Optional[str], allowed: List[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields parameter
+    
+    Args:
+        fields: Raw query parameter, e.g. "id,status"
+        allowed: Response model fields, in model order
+    
+    Returns:
+        Requested fields in model order ("id" is always included),
+        or None if every field should be returned
+    
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not fields:
+        return None
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    requested.add("id")
+    return [field for field in allowed if field in requested]
+
+def build_projection(
+    selected: List[str],
+    sources: Dict[str, str],
+    always: Iterable[str] = ()
+) -> dict:
+    """
+    Build a MongoDB projection for the selected response fields
+    
+    Args:
+        selected: Response fields to return
+        sources: Document field each response field is read from, when it differs
+        always: Document fields needed regardless of the selection (e.g. sort keys)
+    """
+    projection = {sources.get(field, field): 1 for field in selected}
+    projection.update({field: 1 for field in always})
+    return projection
+
+def select_fields(row: dict, selected: Optional[List[str]]) -> dict:
+    """Keep only the selected fields of a response row"""
+    if selected is None:
+        return row
+    return {field: row[field] for field in selected}
@@ -0,0 +1,125 @@
+"""Token-bucket rate limiting with a pluggable bucket store"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Tuple
+from fastapi import HTTPException, status
+from app.utils.metrics import Counter
+
+# Seconds per period accepted in rate strings such as "5/minute"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+rate_limit_rejections = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter",
+    ("limit",)
+)
+
+class RateLimit:
+    """A budget of `capacity` requests per `period` seconds, refilled continuously"""
+    
+    def __init__(self, name: str, capacity: int, period: float):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = capacity / period
+    
+    @classmethod
+    def parse(cls, name: str, rate: str) -> "RateLimit":
+        """
+        Build a limit from a string like "5/minute" or "100/hour"
+        
+        Raises:
+            ValueError: If the string is malformed or the count is below 1
+                (turn limiting off with RATE_LIMIT_ENABLED instead)
+        """
+        count, _, period = rate.partition("/")
+        if period not in PERIODS or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid rate for {name}: {rate!r}")
+        return cls(name, int(count), PERIODS[period])
+
+class TokenBucketStore(ABC):
+    """
+    Storage for token buckets
+    
+    The in-process store below is the default; a shared implementation
+    (e.g. backed by Redis) can replace it so that every worker draws from
+    the same buckets.
+    """
+    
+    @abstractmethod
+    async def take(self, key: str, limit: RateLimit, cost: float = 1) -> Tuple[bool, float]:
+        """
+        Take cost tokens from the bucket for key
+        
+        Returns:
+            Tuple of (allowed, seconds until enough tokens are available)
+        """
+    
+    @abstractmethod
+    async def reset(self):
+        """Forget every bucket"""
+
+class InMemoryTokenBucketStore(TokenBucketStore):
+    """
+    Token buckets held in this worker process
+    
+    Keys are spread over independently locked shards, each holding at most
+    max_keys_per_shard buckets; the least recently used bucket is evicted
+    first, which at worst gives that client a full bucket again.
+    """
+    
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards: List[Tuple[Lock, "OrderedDict[str, Tuple[float, float]]"]] = [
+            (Lock(), OrderedDict()) for _ in range(shards)
+        ]
+    
+    async def take(self, key: str, limit: RateLimit, cost: float = 1) -> Tuple[bool, float]:
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            tokens, updated_at = buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated_at) * limit.refill_per_second)
+            
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            buckets[key] = (tokens, now)
+            buckets.move_to_end(key)
+            if len(buckets) > self.max_keys_per_shard:
+                buckets.popitem(last=False)
+        
+        if allowed:
+            return True, 0.0
+        return False, (cost - tokens) / limit.refill_per_second
+    
+    async def reset(self):
+        for lock, buckets in self._shards:
+            with lock:
+                buckets.clear()
+
+class RateLimiter:
+    """Checks requests against named limits, keyed by client IP, email or user ID"""
+    
+    def __init__(self, store: TokenBucketStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+    
+    async def check(self, limit: RateLimit, key: str, cost: float = 1):
+        """
+        Consume from the bucket of (limit, key)
+        
+        Raises:
+            HTTPException: 429 with Retry-After when the bucket is empty
+        """
+        if not self.enabled:
+            return
+        allowed, retry_after = await self.store.take(f"{limit.name}:{key}", limit, cost)
+        if not allowed:
+            rate_limit_rejections.inc((limit.name,))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(max(1, round(retry_after)))}
+            )
@@ -0,0 +1,145 @@
+"""Revocation of issued tokens, shared between worker processes through MongoDB"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.config import settings
+from app.database import revoked_tokens_collection
+
+logger = logging.getLogger(__name__)
+
+# Re-read a little before the newest revocation seen so far, so writes
+# that were stamped earlier but became visible later are not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# Serializes the first sync of a worker between concurrent requests
+_first_sync_lock = asyncio.Lock()
+
+class RevocationList:
+    """
+    In-memory view of revoked tokens, checked on every authenticated request
+    
+    Holds revoked token IDs (jti) and, per user, a time before which every
+    token issued to that user is revoked. Entries are dropped once the
+    tokens they cover have expired, so the list stays small.
+    """
+    
+    def __init__(self):
+        self._tokens: Dict[str, datetime] = {}  # jti -> expires_at
+        self._users: Dict[str, tuple[float, datetime]] = {}  # user_id -> (revoked_before, expires_at)
+        self.synced_at: Optional[datetime] = None
+        # Newest revoked_at seen, stamped by the database server's clock
+        self.newest_revoked_at: Optional[datetime] = None
+    
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._users)
+    
+    def add(self, entry: dict):
+        """Apply a document from the revoked_tokens collection"""
+        kind, _, key = entry["_id"].partition(":")
+        if kind == "jti":
+            self._tokens[key] = entry["expires_at"]
+        elif kind == "user":
+            current = self._users.get(key)
+            if current is None or current[0] < entry["revoked_before"]:
+                self._users[key] = (entry["revoked_before"], entry["expires_at"])
+    
+    def is_revoked(self, claims: dict) -> bool:
+        """Check decoded token claims against the list"""
+        if claims.get("jti") in self._tokens:
+            return True
+        user_entry = self._users.get(claims.get("user_id"))
+        return user_entry is not None and claims.get("iat", 0) < user_entry[0]
+    
+    def prune(self, now: datetime):
+        """Drop entries whose tokens have expired anyway"""
+        self._tokens = {jti: expires_at for jti, expires_at in self._tokens.items() if expires_at > now}
+        self._users = {
+            user_id: user_entry for user_id, user_entry in self._users.items() if user_entry[1] > now
+        }
+
+# Revocations known to this worker
+revocation_list = RevocationList()
+
+async def revoke_token(jti: str, expires_at: datetime) -> bool:
+    """
+    Revoke a single token
+    
+    Args:
+        jti: Token ID claim
+        expires_at: When the token expires (the entry is deleted after that)
+    
+    Returns:
+        False if the token had already been revoked
+    """
+    entry = {"_id": f"jti:{jti}", "expires_at": expires_at}
+    result = await revoked_tokens_collection.update_one(
+        {"_id": entry["_id"]},
+        {"$setOnInsert": {"expires_at": expires_at}, "$currentDate": {"revoked_at": True}},
+        upsert=True
+    )
+    revocation_list.add(entry)
+    return result.upserted_id is not None
+
+async def revoke_user_tokens(user_id: str):
+    """Revoke every token issued to a user so far (e.g. after a role change)"""
+    now = datetime.utcnow()
+    longest_lifetime = max(settings.access_token_expire_minutes, settings.stateless_access_token_expire_minutes)
+    entry = {
+        "_id": f"user:{user_id}",
+        "revoked_before": time.time(),
+        "expires_at": now + timedelta(minutes=longest_lifetime)
+    }
+    await revoked_tokens_collection.update_one(
+        {"_id": entry["_id"]},
+        {
+            "$set": {"revoked_before": entry["revoked_before"], "expires_at": entry["expires_at"]},
+            "$currentDate": {"revoked_at": True}
+        },
+        upsert=True
+    )
+    revocation_list.add(entry)
+
+async def sync_revocations():
+    """
+    Load the revocations recorded by any worker since the last sync
+    
+    revoked_at is set by the database server ($currentDate), so entries
+    are compared against a timestamp from the same clock rather than
+    this worker's, which may be behind or ahead of the other workers.
+    """
+    now = datetime.utcnow()
+    query = {"expires_at": {"$gt": now}}
+    if revocation_list.newest_revoked_at is not None:
+        query["revoked_at"] = {"$gte": revocation_list.newest_revoked_at - SYNC_OVERLAP}
+    
+    async for entry in revoked_tokens_collection.find(query):
+        revocation_list.add(entry)
+        revoked_at = entry.get("revoked_at")
+        if revoked_at and (revocation_list.newest_revoked_at is None or revoked_at > revocation_list.newest_revoked_at):
+            revocation_list.newest_revoked_at = revoked_at
+    revocation_list.prune(now)
+    revocation_list.synced_at = now
+
+async def ensure_revocations_loaded():
+    """
+    Wait until this worker has synced the revocation list at least once
+    
+    Startup does not wait for MongoDB, so the first authenticated request
+    performs the first sync if the background task has not yet.
+    """
+    if revocation_list.synced_at is not None:
+        return
+    async with _first_sync_lock:
+        if revocation_list.synced_at is None:
+            await sync_revocations()
+
+async def run_revocation_sync():
+    """Background task keeping this worker's revocation list current"""
+    while True:
+        try:
+            await sync_revocations()
+        except Exception:
+            logger.exception("Revocation sync failed")
+        await asyncio.sleep(settings.revocation_sync_seconds)
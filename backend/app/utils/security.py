@@ -1,41 +1,185 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+from typing import List, Optional, Tuple
 from app.config import settings
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds
+)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashing jobs are already waiting"""
+
+# Worker pool for bcrypt work (created on first use)
+_hash_executor: Optional[Executor] = None
+_hash_semaphore: Optional[asyncio.Semaphore] = None
+_hash_pending = 0
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
     return pwd_context.hash(password)
 
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords (one pool job for many hashes, see app.importer)"""
+    return [pwd_context.hash(password) for password in passwords]
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_rehash_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its hash uses outdated settings
+    
+    Args:
+        plain_password: Password supplied by the user
+        hashed_password: Stored bcrypt hash
+    
+    Returns:
+        Tuple of (is_valid, new_hash); new_hash is None unless the stored
+        hash should be replaced (e.g. after bcrypt_rounds was changed)
+    """
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    
+    return True, None
+
+def _get_hash_executor() -> Executor:
+    """Create the password hashing pool on first use"""
+    global _hash_executor, _hash_semaphore
+    if _hash_executor is None:
+        if settings.password_hash_executor == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix="password-hash"
+            )
+        _hash_semaphore = asyncio.Semaphore(settings.password_hash_workers)
+    return _hash_executor
+
+async def _run_password_job(func, *args):
+    """
+    Run a bcrypt job on the worker pool without blocking the event loop
+    
+    At most password_hash_workers jobs run at once. Once
+    password_hash_max_pending jobs are in flight, new jobs are rejected
+    with PasswordHasherBusy instead of queueing without bound.
+    """
+    global _hash_pending
+    executor = _get_hash_executor()
+    
+    if _hash_pending >= settings.password_hash_max_pending:
+        raise PasswordHasherBusy()
+    
+    _hash_pending += 1
+    try:
+        async with _hash_semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the worker pool"""
+    return await _run_password_job(hash_password, password)
+
+async def verify_and_rehash_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify (and possibly rehash) a password on the worker pool"""
+    return await _run_password_job(verify_and_rehash_password, plain_password, hashed_password)
+
+# Passwords per pool job in hash_passwords_async; small jobs let logins
+# take turns with a bulk import on the shared pool
+BULK_HASH_JOB_SIZE = 8
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords on the worker pool (imports through the API)
+    
+    The passwords are hashed in small jobs on at most half of the pool at
+    a time, so logins and signups are still served during an import.
+    
+    Raises:
+        PasswordHasherBusy: If the pool is saturated
+    """
+    lanes = asyncio.Semaphore(max(1, settings.password_hash_workers // 2))
+    
+    async def run_job(job: List[str]) -> List[str]:
+        async with lanes:
+            return await _run_password_job(hash_passwords, job)
+    
+    jobs = [passwords[start:start + BULK_HASH_JOB_SIZE] for start in range(0, len(passwords), BULK_HASH_JOB_SIZE)]
+    return [hashed for job_hashes in await asyncio.gather(*(run_job(job) for job in jobs)) for hashed in job_hashes]
+
+def shutdown_password_hasher():
+    """Stop the password hashing pool"""
+    global _hash_executor, _hash_semaphore
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+        _hash_semaphore = None
+
+# Value of the "type" claim; tokens issued before it existed count as access tokens
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+def access_token_lifetime() -> timedelta:
+    """How long new access tokens are valid (short-lived in stateless mode)"""
+    if settings.stateless_auth:
+        return timedelta(minutes=settings.stateless_access_token_expire_minutes)
+    return timedelta(minutes=settings.access_token_expire_minutes)
+
+def _encode_token(data: dict, token_type: str, lifetime: timedelta) -> str:
+    # iat is fractional so revocations take effect for tokens issued earlier
+    # in the same second, but not for ones issued right after
+    to_encode = data.copy()
+    to_encode.update({
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": time.time(),
+        "exp": datetime.utcnow() + lifetime
+    })
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """
     Create a JWT access token
     
     Args:
-        data: Dictionary containing user data to encode
+        data: Dictionary containing user data to encode (user_id, name, email, role)
         expires_delta: Optional custom expiration time
     
     Returns:
         Encoded JWT token string
     """
-    to_encode = data.copy()
-    
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    return _encode_token(data, ACCESS_TOKEN_TYPE, expires_delta or access_token_lifetime())
+
+def create_refresh_token(user_id: str) -> str:
+    """
+    Create a long-lived JWT refresh token, exchanged for new tokens at /api/auth/refresh
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    Args:
+        user_id: ID of the user the token is issued to
     
-    return encoded_jwt
+    Returns:
+        Encoded JWT token string
+    """
+    return _encode_token(
+        {"user_id": user_id},
+        REFRESH_TOKEN_TYPE,
+        timedelta(days=settings.refresh_token_expire_days)
+    )
 
 def decode_access_token(token: str) -> dict:
     """
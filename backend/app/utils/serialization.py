@@ -0,0 +1,33 @@
+"""Fast JSON serialization for list endpoints"""
+from typing import Any
+import orjson
+from fastapi import Response
+
+def dumps(data: Any) -> bytes:
+    """
+    Encode plain rows as JSON bytes with orjson
+    
+    This is an untyped encoder: it writes every key of every row as is and
+    knows nothing of the response models (no aliases, field serializers or
+    field filtering). Rows must therefore be built key by key from the
+    documents, e.g. by task_doc_to_dict or user_doc_to_dict, with exactly
+    the fields of the endpoint's response model. Values must be JSON types,
+    enums or naive UTC datetimes (as read from MongoDB); anything else,
+    such as an ObjectId, raises TypeError rather than being guessed at.
+    """
+    return orjson.dumps(data)
+
+def json_response(data: Any, response: Response) -> Response:
+    """
+    Serialize the rows of a list endpoint straight to a JSON response
+    
+    Skips building a model per row and FastAPI's response_model
+    validation (EmailStr alone dominates the cost of the user list
+    otherwise). The endpoint's response_model still documents the shape;
+    see dumps for what the rows must look like.
+    
+    Args:
+        data: Rows built with the response model's fields (e.g. a list of dicts)
+        response: Response injected into the endpoint; its headers are kept
+    """
+    return Response(content=dumps(data), media_type="application/json", headers=dict(response.headers))
@@ -0,0 +1,453 @@
+"""
+Load test: API throughput and latency under a mixed workload
+
+Seeds users and tasks straight into MongoDB with a realistic role and
+assignment distribution, then drives a weighted mix of login, list, search,
+calendar and update requests through the FastAPI app in-process with an
+async HTTP client. Reports throughput and p50/p95/p99 latency per endpoint,
+as the median of several runs, and compares them against a checked-in
+baseline. Only throughput and p50 are gated: tail latencies are too noisy
+between runs (the in-memory backend especially) to fail a build on.
+
+Runs against a local mongod (a separate benchmark database that is dropped
+afterwards) or, with --in-memory, against mongomock-motor with no server
+and no network access. The in-memory stand-in has no $text support, so the
+search operation is left out of its mix.
+
+Extra dependencies (from the backend directory):
+    pip install -r benchmarks/requirements.txt
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_api --in-memory
+    python -m benchmarks.bench_api --mongodb-url mongodb://localhost:27017
+    python -m benchmarks.bench_api --in-memory --write-baseline
+    python -m benchmarks.bench_api --users 500 --tasks 20000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from bson import ObjectId
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("bench_api needs httpx: pip install -r benchmarks/requirements.txt")
+
+from app.config import settings
+from app.main import app
+from app.middleware.rate_limit import rate_limiter
+from app.utils.security import hash_password
+import app.database as database
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+BENCH_PASSWORD = "Bench@123"
+TASK_STATUSES = ["todo", "in_progress", "completed"]
+DEFAULT_MIX = "login=5,list=45,search=10,calendar=15,update=25"
+
+# Vocabulary for task titles and descriptions (also used as search terms)
+VERBS = ["review", "update", "deploy", "design", "write", "fix", "migrate", "test", "plan", "document"]
+NOUNS = [
+    "invoice", "dashboard", "release", "report", "onboarding", "api", "database",
+    "budget", "roadmap", "backup", "newsletter", "contract", "schema", "sprint"
+]
+
+class SeedData:
+    """Users and tasks written by seed_data, as needed to drive the workload"""
+    
+    def __init__(self):
+        self.users: List[dict] = []
+        self.editable_tasks: Dict[str, List[str]] = {}
+
+def seed_data(rng: random.Random, user_count: int, task_count: int) -> tuple[SeedData, list, list]:
+    """
+    Build the benchmark users and tasks
+    
+    About 2% of users are admins and 10% managers. Managers and admins
+    create the tasks; assignees are drawn from regular users with a
+    long-tailed distribution, so a few users own most of the work.
+    
+    Returns:
+        Tuple of (SeedData, user documents, task documents)
+    """
+    admin_count = max(1, user_count // 50)
+    manager_count = max(1, user_count // 10)
+    user_count = max(user_count, admin_count + manager_count + 1)
+    
+    # One bcrypt hash shared by every user keeps seeding fast while
+    # logins still pay the configured cost
+    hashed_pwd = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow()
+    
+    seed = SeedData()
+    user_docs = []
+    for i in range(user_count):
+        if i < admin_count:
+            role = "admin"
+        elif i < admin_count + manager_count:
+            role = "manager"
+        else:
+            role = "user"
+        user_id = ObjectId()
+        user_docs.append({
+            "_id": user_id,
+            "name": f"Bench {role.capitalize()} {i}",
+            "email": f"{role}{i}@bench.example.com",
+            "role": role,
+            "hashed_password": hashed_pwd,
+            "created_at": now - timedelta(days=rng.randint(0, 365))
+        })
+        seed.users.append({
+            "id": str(user_id),
+            "name": user_docs[-1]["name"],
+            "email": user_docs[-1]["email"],
+            "role": role
+        })
+        seed.editable_tasks[str(user_id)] = []
+    
+    creators = [user for user in seed.users if user["role"] != "user"]
+    creator_weights = [1 if user["role"] == "admin" else 9 for user in creators]
+    assignees = [user for user in seed.users if user["role"] == "user"]
+    assignee_weights = [1 / (rank + 1) for rank in range(len(assignees))]
+    
+    task_docs = []
+    for i in range(task_count):
+        creator = rng.choices(creators, creator_weights)[0]
+        assignee = rng.choices(assignees, assignee_weights)[0]
+        created_at = now - timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+        task_id = ObjectId()
+        task_docs.append({
+            "_id": task_id,
+            "title": f"{rng.choice(VERBS).capitalize()} {rng.choice(NOUNS)} {i}",
+            "description": " ".join(rng.choices(VERBS + NOUNS, k=12)),
+            "status": rng.choices(TASK_STATUSES, [4, 3, 3])[0],
+            "due_date": now + timedelta(days=rng.randint(-90, 90)) if rng.random() < 0.8 else None,
+            "assigned_to": assignee["id"],
+            "assigned_to_name": assignee["name"],
+            "created_by": creator["id"],
+            "created_by_name": creator["name"],
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+        seed.editable_tasks[creator["id"]].append(str(task_id))
+        seed.editable_tasks[assignee["id"]].append(str(task_id))
+    
+    # Admins may update any task
+    for user in seed.users:
+        if user["role"] == "admin":
+            seed.editable_tasks[user["id"]] = [str(task_doc["_id"]) for task_doc in task_docs]
+    
+    return seed, user_docs, task_docs
+
+async def insert_seed(user_docs: list, task_docs: list, chunk_size: int = 1000):
+    """Write the seeded documents in unordered batches"""
+    for start in range(0, len(user_docs), chunk_size):
+        await database.users_collection.insert_many(user_docs[start:start + chunk_size], ordered=False)
+    for start in range(0, len(task_docs), chunk_size):
+        await database.tasks_collection.insert_many(task_docs[start:start + chunk_size], ordered=False)
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse "name=weight,..." into a dict of operation weights"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name.strip()}")
+        weights[name.strip()] = int(weight)
+    return weights
+
+# Workload operations: each sends one request as the session's user
+
+async def op_login(client: httpx.AsyncClient, session: dict, rng: random.Random) -> httpx.Response:
+    return await client.post(
+        "/api/auth/login",
+        json={"email": session["email"], "password": BENCH_PASSWORD}
+    )
+
+async def op_list(client: httpx.AsyncClient, session: dict, rng: random.Random) -> httpx.Response:
+    params = {"limit": 50}
+    if rng.random() < 0.3:
+        params["status"] = rng.choice(TASK_STATUSES)
+    return await client.get("/api/tasks", params=params, headers=session["headers"])
+
+async def op_search(client: httpx.AsyncClient, session: dict, rng: random.Random) -> httpx.Response:
+    params = {"limit": 20, "search": rng.choice(NOUNS)}
+    return await client.get("/api/tasks", params=params, headers=session["headers"])
+
+async def op_calendar(client: httpx.AsyncClient, session: dict, rng: random.Random) -> httpx.Response:
+    start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    start += timedelta(days=31 * rng.randint(-2, 2))
+    params = {"start_date": start.isoformat(), "end_date": (start + timedelta(days=42)).isoformat()}
+    return await client.get("/api/tasks/calendar", params=params, headers=session["headers"])
+
+async def op_update(client: httpx.AsyncClient, session: dict, rng: random.Random) -> httpx.Response:
+    task_id = rng.choice(session["tasks"])
+    return await client.put(
+        f"/api/tasks/{task_id}",
+        json={"status": rng.choice(TASK_STATUSES)},
+        headers=session["headers"]
+    )
+
+OPERATIONS = {
+    "login": op_login,
+    "list": op_list,
+    "search": op_search,
+    "calendar": op_calendar,
+    "update": op_update,
+}
+
+async def open_sessions(client: httpx.AsyncClient, seed: SeedData, rng: random.Random, count: int) -> List[dict]:
+    """Log in one seeded user per virtual client (not measured)"""
+    candidates = [user for user in seed.users if seed.editable_tasks[user["id"]]]
+    sessions = []
+    for user in rng.sample(candidates, min(count, len(candidates))):
+        response = await op_login(client, {"email": user["email"]}, rng)
+        response.raise_for_status()
+        sessions.append({
+            "email": user["email"],
+            "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+            "tasks": seed.editable_tasks[user["id"]]
+        })
+    return sessions
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    sessions: List[dict],
+    weights: Dict[str, int],
+    total_requests: int,
+    rng: random.Random
+) -> tuple[Dict[str, List[float]], Dict[str, int], float]:
+    """
+    Drive total_requests weighted operations from one task per session
+    
+    Returns:
+        Tuple of (latencies in seconds per operation, error counts per operation, wall time)
+    """
+    names = list(weights)
+    plan = rng.choices(names, [weights[name] for name in names], k=total_requests)
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    
+    async def virtual_client(session: dict, worker_rng: random.Random):
+        while plan:
+            name = plan.pop()
+            start = time.perf_counter()
+            try:
+                response = await OPERATIONS[name](client, session, worker_rng)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies[name].append(time.perf_counter() - start)
+            if failed:
+                errors[name] += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        virtual_client(session, random.Random(rng.random()))
+        for session in sessions
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, dict]:
+    """Throughput and latency percentiles (in milliseconds) per operation and overall"""
+    results = {}
+    everything = []
+    for name, values in latencies.items():
+        values = sorted(values)
+        everything.extend(values)
+        results[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2)
+        }
+    everything.sort()
+    results["total"] = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "throughput": round(len(everything) / elapsed, 1),
+        "p50_ms": round(percentile(everything, 50) * 1000, 2),
+        "p95_ms": round(percentile(everything, 95) * 1000, 2),
+        "p99_ms": round(percentile(everything, 99) * 1000, 2)
+    }
+    return results
+
+def median_results(runs: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """Median of every metric over several runs (errors are summed)"""
+    results = {}
+    for name in runs[0]:
+        rows = [run_results[name] for run_results in runs]
+        results[name] = {
+            metric: sum(row[metric] for row in rows) if metric == "errors" else statistics.median(row[metric] for row in rows)
+            for metric in rows[0]
+        }
+    return results
+
+def print_results(results: Dict[str, dict], baseline: Optional[Dict[str, dict]]):
+    print(f"{'endpoint':<10}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}   vs baseline (req/s, p50)")
+    for name, row in results.items():
+        line = (
+            f"{name:<10}{row['requests']:>9.0f}{row['errors']:>8}{row['throughput']:>9.1f}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+        if baseline and name in baseline:
+            base = baseline[name]
+            line += (
+                f"   {relative_change(row['throughput'], base['throughput']):>+7.1%}"
+                f" {relative_change(row['p50_ms'], base['p50_ms']):>+7.1%}"
+            )
+        print(line)
+
+def relative_change(value: float, base: float) -> float:
+    return (value - base) / base if base else 0.0
+
+def find_regressions(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Operations whose throughput dropped or p50 grew by more than tolerance"""
+    regressions = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if relative_change(row["throughput"], base["throughput"]) < -tolerance:
+            regressions.append(f"{name}: throughput {base['throughput']} -> {row['throughput']} req/s")
+        if relative_change(row["p50_ms"], base["p50_ms"]) > tolerance:
+            regressions.append(f"{name}: p50 {base['p50_ms']} -> {row['p50_ms']} ms")
+    return regressions
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor: pip install -r benchmarks/requirements.txt")
+        database.client = AsyncMongoMockClient()
+        # The stand-in is a single node without sessions, so lists read the primary
+        settings.mongo_list_read_preference = "primary"
+        if weights.pop("search", None):
+            print("note: the in-memory stand-in has no $text support, skipping search")
+    else:
+        settings.mongodb_url = args.mongodb_url
+    settings.database_name = args.database
+    settings.index_build_mode = "off"
+    rate_limiter.enabled = False  # Measure the API, not the throttling
+    
+    config = {
+        "backend": "in-memory" if args.in_memory else "mongod",
+        "users": args.users,
+        "tasks": args.tasks,
+        "requests": args.requests,
+        "runs": args.runs,
+        "concurrency": args.concurrency,
+        "mix": weights,
+        "seed": args.seed,
+        "bcrypt_rounds": settings.bcrypt_rounds
+    }
+    
+    # Start from an empty, indexed database
+    await database.connect_db().drop_database(args.database)
+    await database.init_db()
+    
+    async with app.router.lifespan_context(app):
+        print(f"Seeding {args.users} users and {args.tasks} tasks...")
+        seed, user_docs, task_docs = seed_data(rng, args.users, args.tasks)
+        await insert_seed(user_docs, task_docs)
+        
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            sessions = await open_sessions(client, seed, rng, args.concurrency)
+            if args.warmup:
+                await run_workload(client, sessions, weights, args.warmup, rng)
+            
+            print(f"Running {args.runs} x {args.requests} requests from {len(sessions)} concurrent clients...\n")
+            runs = []
+            for _ in range(args.runs):
+                latencies, errors, elapsed = await run_workload(client, sessions, weights, args.requests, rng)
+                runs.append(summarize(latencies, errors, elapsed))
+        
+        if not args.keep_data:
+            await database.connect_db().drop_database(args.database)
+    
+    results = median_results(runs)
+    baseline_path = Path(args.baseline) if args.baseline else BASELINE_DIR / f"api_{config['backend']}.json"
+    
+    if args.write_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "config": config,
+            "results": results
+        }, indent=2) + "\n")
+        print_results(results, None)
+        print(f"\nBaseline written to {baseline_path}")
+        return 0
+    
+    baseline = None
+    if baseline_path.exists():
+        recorded = json.loads(baseline_path.read_text())
+        if recorded["config"] == config:
+            baseline = recorded["results"]
+        else:
+            print(f"note: {baseline_path.name} was recorded with a different configuration, not comparing\n")
+    else:
+        print(f"note: no baseline at {baseline_path}, record one with --write-baseline\n")
+    
+    print_results(results, baseline)
+    
+    if results["total"]["errors"]:
+        print(f"\n{results['total']['errors']} requests failed")
+        return 1
+    
+    if baseline:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%} of the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with a mixed workload")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of a MongoDB server")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017", help="MongoDB server to benchmark against")
+    parser.add_argument("--database", default="task_management_bench", help="Database to seed (dropped before and after the run)")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed")
+    parser.add_argument("--tasks", type=int, default=5000, help="Tasks to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per run")
+    parser.add_argument("--runs", type=int, default=3, help="Measured runs (results are the median)")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests before the run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, e.g. list=50,update=50")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and workload")
+    parser.add_argument("--baseline", help="Baseline file (default: baselines/api_<backend>.json)")
+    parser.add_argument("--write-baseline", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the seeded database after the run")
+    args = parser.parse_args()
+    
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Scaling benchmark: throughput of python -m app.serve from 1 to N workers
+
+Seeds users and tasks into MongoDB (as bench_api does), then starts the
+multi-process server once per worker count and drives one endpoint for a
+fixed time from several load-generating processes over real HTTP. Reports
+requests per second, the speedup over one worker and p50/p95 latency for
+each worker count.
+
+The load generators run on the same machine and need CPU of their own, so
+throughput stops scaling before the worker count reaches the CPU count;
+use --client-processes to balance the two, or pin the server with taskset.
+The health endpoint needs no MongoDB and measures the server overhead
+alone.
+
+Extra dependencies (from the backend directory):
+    pip install -r benchmarks/requirements.txt
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scaling --endpoint health
+    python -m benchmarks.bench_scaling --endpoint list --mongodb-url mongodb://localhost:27017
+    python -m benchmarks.bench_scaling --endpoint login --workers 1,2,4,8 --duration 20
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+from benchmarks.bench_api import SeedData, httpx, insert_seed, op_list, op_login, open_sessions, percentile, seed_data
+from benchmarks.bench_startup import free_port
+from app.config import settings
+from app.serve import available_cpus
+import app.database as database
+
+async def op_health(client: httpx.AsyncClient, session: dict, rng: random.Random) -> httpx.Response:
+    return await client.get("/health")
+
+ENDPOINTS = {
+    "health": op_health,
+    "list": op_list,
+    "login": op_login,
+}
+
+def default_worker_counts() -> List[int]:
+    """1, 2, 4, ... up to and including the available CPUs"""
+    cpus = available_cpus()
+    counts = []
+    count = 1
+    while count < cpus:
+        counts.append(count)
+        count *= 2
+    counts.append(cpus)
+    return counts
+
+def start_server(workers: int, port: int, env: Dict[str, str], timeout: float) -> subprocess.Popen:
+    """Launch python -m app.serve and wait until /health answers"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.05)
+    stop_server(process)
+    raise RuntimeError(f"Server not answering within {timeout}s")
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def generate_load(
+    base_url: str,
+    endpoint: str,
+    sessions: List[dict],
+    start_at: float,
+    duration: float,
+    seed: int
+) -> tuple[List[float], int]:
+    """
+    Send requests from one virtual client per session until the run ends
+    
+    Returns:
+        Tuple of (latencies in seconds of the requests that started in the
+        measured window, number of those that failed)
+    """
+    operation = ENDPOINTS[endpoint]
+    latencies = []
+    errors = 0
+    end_at = start_at + duration
+    limits = httpx.Limits(max_connections=len(sessions), max_keepalive_connections=len(sessions))
+    
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def virtual_client(session: dict, rng: random.Random):
+            nonlocal errors
+            while time.time() < end_at:
+                measured = time.time() >= start_at
+                start = time.perf_counter()
+                try:
+                    response = await operation(client, session, rng)
+                    failed = response.status_code >= 400
+                except Exception:
+                    failed = True
+                if measured:
+                    latencies.append(time.perf_counter() - start)
+                    errors += failed
+        
+        rng = random.Random(seed)
+        await asyncio.gather(*(virtual_client(session, random.Random(rng.random())) for session in sessions))
+    return latencies, errors
+
+def client_process(job: tuple) -> tuple[List[float], int]:
+    return asyncio.run(generate_load(*job))
+
+def measure(
+    pool,
+    base_url: str,
+    endpoint: str,
+    sessions: List[dict],
+    client_processes: int,
+    warmup: float,
+    duration: float,
+    seed: int
+) -> dict:
+    """Run the load generators against one server and summarize the measured window"""
+    # Every process starts at the same wall-clock time; requests sent
+    # during the warmup are not measured
+    start_at = time.time() + 1 + warmup
+    jobs = [
+        (base_url, endpoint, sessions[index::client_processes], start_at, duration, seed + index)
+        for index in range(client_processes)
+    ]
+    latencies = []
+    errors = 0
+    for process_latencies, process_errors in pool.map(client_process, jobs):
+        latencies.extend(process_latencies)
+        errors += process_errors
+    
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000
+    }
+
+async def prepare_database(args) -> SeedData:
+    """Seed an empty, indexed benchmark database"""
+    settings.mongodb_url = args.mongodb_url
+    settings.database_name = args.database
+    rng = random.Random(args.seed)
+    try:
+        await database.connect_db().drop_database(args.database)
+        await database.init_db()
+        print(f"Seeding {args.users} users and {args.tasks} tasks...")
+        seed, user_docs, task_docs = seed_data(rng, args.users, args.tasks)
+        await insert_seed(user_docs, task_docs)
+    finally:
+        database.close_db()
+    return seed
+
+async def log_in(base_url: str, seed: SeedData, count: int, rng_seed: int) -> List[dict]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        return await open_sessions(client, seed, random.Random(rng_seed), count)
+
+async def drop_database(args):
+    try:
+        await database.connect_db().drop_database(args.database)
+    finally:
+        database.close_db()
+
+def print_results(endpoint: str, results: Dict[int, dict]):
+    print(f"\n{endpoint}: {'workers':>7}{'req/s':>10}{'speedup':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}")
+    base = results[min(results)]["throughput"]
+    for workers, row in results.items():
+        speedup = row["throughput"] / base if base else 0.0
+        print(
+            f"{'':<{len(endpoint) + 2}}{workers:>7}{row['throughput']:>10.1f}{speedup:>8.2f}x"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['errors']:>8}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput scaling over server worker counts")
+    parser.add_argument("--endpoint", choices=list(ENDPOINTS), default="list", help="Endpoint to load")
+    parser.add_argument("--workers", help="Comma-separated worker counts (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017", help="MongoDB server for list and login")
+    parser.add_argument("--database", default="task_management_bench", help="Database to seed (dropped before and after the run)")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed")
+    parser.add_argument("--tasks", type=int, default=5000, help="Tasks to seed")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent connections in total")
+    parser.add_argument("--client-processes", type=int, default=max(1, available_cpus() // 2), help="Load-generating processes")
+    parser.add_argument("--duration", type=float, default=10, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds of load before each measurement")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and workload")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the seeded database after the run")
+    parser.add_argument("--timeout", type=float, default=30, help="Give up on a server launch after this many seconds")
+    args = parser.parse_args()
+    
+    try:
+        worker_counts = [int(count) for count in args.workers.split(",")] if args.workers else default_worker_counts()
+    except ValueError:
+        parser.error("--workers takes comma-separated numbers, e.g. 1,2,4")
+    client_processes = max(1, min(args.client_processes, args.concurrency))
+    uses_database = args.endpoint != "health"
+    
+    env = dict(
+        os.environ,
+        MONGODB_URL=args.mongodb_url,
+        DATABASE_NAME=args.database,
+        INDEX_BUILD_MODE="off",
+        RATE_LIMIT_ENABLED="false"  # Measure the API, not the throttling
+    )
+    
+    seed = asyncio.run(prepare_database(args)) if uses_database else None
+    sessions = [{} for _ in range(args.concurrency)]
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    
+    print(
+        f"Loading {args.endpoint} with {args.concurrency} connections from {client_processes} processes "
+        f"for {args.duration:g}s per worker count ({available_cpus()} CPUs available)"
+    )
+    results = {}
+    try:
+        with multiprocessing.Pool(client_processes) as pool:
+            for workers in worker_counts:
+                server = start_server(workers, port, env, args.timeout)
+                try:
+                    if uses_database and not sessions[0]:
+                        # Tokens stay valid across server restarts
+                        sessions = asyncio.run(log_in(base_url, seed, args.concurrency, args.seed))
+                    results[workers] = measure(
+                        pool, base_url, args.endpoint, sessions, client_processes, args.warmup, args.duration, args.seed
+                    )
+                finally:
+                    stop_server(server)
+                row = results[workers]
+                print(f"  {workers} workers: {row['throughput']:.1f} req/s")
+    finally:
+        if uses_database and not args.keep_data:
+            asyncio.run(drop_database(args))
+    
+    print_results(args.endpoint, results)
+    if any(row["errors"] for row in results.values()):
+        print(f"\n{sum(row['errors'] for row in results.values())} requests failed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
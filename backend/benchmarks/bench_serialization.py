@@ -0,0 +1,128 @@
+"""
+Micro-benchmark: list response serialization
+
+Compares the per-row model + FastAPI response_model path with the orjson
+path of app.utils.serialization (plain rows, no models), for the tasks and
+users list endpoints, and checks that both produce identical JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --rows 100 --repeat 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.models.task import TaskResponse
+from app.models.user import UserResponse
+from app.routes.tasks import build_task_response, task_doc_to_dict
+from app.routes.users import user_doc_to_dict
+from app.utils.serialization import json_response
+
+def make_task_docs(rows: int) -> list:
+    """Task documents as returned by MongoDB"""
+    user_ids = [str(ObjectId()) for _ in range(10)]
+    now = datetime.utcnow()
+    docs = [
+        {
+            "_id": ObjectId(),
+            "title": f"Task {i}",
+            "description": "Write comprehensive README and API docs " * 4,
+            "status": ("todo", "in_progress", "completed")[i % 3],
+            "due_date": now + timedelta(days=i % 30),
+            "assigned_to": user_ids[i % 10],
+            "assigned_to_name": f"User {i % 10}",
+            "created_by": user_ids[(i + 1) % 10],
+            "created_by_name": f"User {(i + 1) % 10}",
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(rows)
+    ]
+    return docs
+
+def make_user_docs(rows: int) -> list:
+    """User documents as returned by MongoDB"""
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "role": ("admin", "manager", "user")[i % 3],
+            "created_at": now
+        }
+        for i in range(rows)
+    ]
+
+async def response_model_path(field, models) -> bytes:
+    """What FastAPI does with a list of models and response_model=List[...]"""
+    content = await serialize_response(field=field, response_content=models)
+    return JSONResponse(content).body
+
+def timed(func, repeat: int) -> float:
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def compare(name: str, old, new, repeat: int):
+    old_body, new_body = old(), new()
+    assert old_body == new_body, f"{name}: serialized output differs"
+    
+    old_time = timed(old, repeat)
+    new_time = timed(new, repeat)
+    print(
+        f"{name:<8} response_model: {old_time * 1e6:9.1f} us   "
+        f"orjson: {new_time * 1e6:9.1f} us   speedup: {old_time / new_time:5.2f}x"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=500, help="Iterations per measurement")
+    args = parser.parse_args()
+    
+    loop = asyncio.new_event_loop()
+    
+    task_docs = make_task_docs(args.rows)
+    task_field = create_response_field(name="response", type_=List[TaskResponse], mode="serialization")
+    compare(
+        "tasks",
+        lambda: loop.run_until_complete(response_model_path(
+            task_field,
+            [build_task_response(task_doc) for task_doc in task_docs]
+        )),
+        lambda: json_response(
+            [task_doc_to_dict(task_doc) for task_doc in task_docs],
+            Response()
+        ).body,
+        args.repeat
+    )
+    
+    user_docs = make_user_docs(args.rows)
+    user_field = create_response_field(name="response", type_=List[UserResponse], mode="serialization")
+    compare(
+        "users",
+        lambda: loop.run_until_complete(response_model_path(
+            user_field,
+            [UserResponse(**user_doc_to_dict(user_doc)) for user_doc in user_docs]
+        )),
+        lambda: json_response(
+            [user_doc_to_dict(user_doc) for user_doc in user_docs],
+            Response()
+        ).body,
+        args.repeat
+    )
+    
+    loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold-start benchmark: time from launching a worker to its first served request
+
+Starts `uvicorn app.main:app` in a fresh process several times and polls
+/health until it answers, then reports the time to first response against
+a budget. Startup does not wait for MongoDB, so this runs without a server.
+With --imports it also lists the slowest modules imported by app.main.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 1500
+    python -m benchmarks.bench_startup --imports
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_to_first_response(timeout: float) -> float:
+    """Launch one worker and return the seconds until /health answers"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ)
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Worker exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"No response within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+def slowest_imports(count: int) -> list:
+    """(cumulative microseconds, module) of the slowest imports under app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker cold-start time")
+    parser.add_argument("--runs", type=int, default=5, help="Worker launches to measure")
+    parser.add_argument("--budget-ms", type=float, default=2000, help="Maximum median time to first response")
+    parser.add_argument("--timeout", type=float, default=30, help="Give up on a launch after this many seconds")
+    parser.add_argument("--imports", action="store_true", help="Also list the slowest imports")
+    args = parser.parse_args()
+    
+    timings = [time_to_first_response(args.timeout) * 1000 for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(
+        f"time to first response over {args.runs} runs: "
+        f"min {min(timings):.0f} ms   median {median:.0f} ms   max {max(timings):.0f} ms   "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+    
+    if args.imports:
+        print("\nslowest imports (cumulative):")
+        for micros, module in slowest_imports(15):
+            print(f"  {micros / 1000:8.1f} ms  {module}")
+    
+    if median > args.budget_ms:
+        print(f"\nOver budget by {median - args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Shared fixtures: the app running against mongomock-motor, an in-memory
+stand-in for MongoDB, so the tests need no server
+
+Extra dependencies (from the backend directory):
+    pip install -r tests/requirements.txt
+
+Usage (from the backend directory):
+    python -m pytest
+"""
+import os
+
+# Cheap password hashes (read when app.utils.security is imported)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from typing import List
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+import app.database as database
+from app.config import settings
+from app.database import CollectionProxy
+from app.main import app
+from app.middleware.rate_limit import rate_limiter
+
+TEST_PASSWORD = "Secret@123"
+
+# Collection methods that send a read command to the server
+READ_METHODS = {"find", "find_one", "aggregate", "count_documents", "distinct"}
+
+class QueryLog:
+    """(collection, method) of every read issued through the collection handles"""
+    
+    def __init__(self):
+        self.reads: List[tuple[str, str]] = []
+    
+    def count(self, collection: str) -> int:
+        return sum(1 for name, _ in self.reads if name == collection)
+    
+    def clear(self):
+        self.reads.clear()
+
+class LoggedCollection:
+    """Wraps a collection and records its reads in a QueryLog"""
+    
+    def __init__(self, collection, name: str, log: QueryLog):
+        self._collection = collection
+        self._name = name
+        self._log = log
+    
+    def __getattr__(self, attr):
+        if attr in READ_METHODS:
+            self._log.reads.append((self._name, attr))
+        return getattr(self._collection, attr)
+
+@pytest.fixture(autouse=True)
+def mongo(monkeypatch):
+    """A fresh, empty in-memory database for every test"""
+    monkeypatch.setattr(database, "client", AsyncMongoMockClient())
+    # The stand-in is a single node without sessions
+    monkeypatch.setattr(settings, "mongo_list_read_preference", "primary")
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+
+@pytest.fixture
+def query_log(monkeypatch) -> QueryLog:
+    """Record the reads every collection handle sends from now on"""
+    log = QueryLog()
+    get_collection = CollectionProxy.get_collection
+    monkeypatch.setattr(
+        CollectionProxy,
+        "get_collection",
+        lambda proxy: LoggedCollection(get_collection(proxy), proxy.name, log)
+    )
+    return log
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+@pytest.fixture
+def signup(client):
+    """Register a user and return (user ID, auth headers)"""
+    def signup_user(name: str, role: str = "user") -> tuple[str, dict]:
+        response = client.post("/api/auth/signup", json={
+            "name": name,
+            "email": f"{name.lower().replace(' ', '.')}@example.com",
+            "password": TEST_PASSWORD,
+            "role": role
+        })
+        assert response.status_code == 201, response.text
+        token = response.json()
+        return token["user"]["id"], {"Authorization": f"Bearer {token['access_token']}"}
+    return signup_user
@@ -0,0 +1,58 @@
+"""POST /api/tasks/bulk"""
+
+def create_task(client, headers: dict, assigned_to: str, title: str = "Task") -> str:
+    response = client.post("/api/tasks", json={"title": title, "assigned_to": assigned_to}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+def workload(client, headers: dict, user_id: str) -> dict:
+    rows = client.get("/api/users/workload", headers=headers).json()
+    return next(row for row in rows if row["id"] == user_id)
+
+def test_repeated_task_is_rejected(client, signup):
+    _, admin = signup("Admin", "admin")
+    user_id, _ = signup("User")
+    task_id = create_task(client, admin, user_id)
+    
+    for operations in (
+        [
+            {"action": "update_status", "task_id": task_id, "status": "in_progress"},
+            {"action": "update_status", "task_id": task_id, "status": "completed"}
+        ],
+        [
+            {"action": "delete", "task_id": task_id},
+            {"action": "update_status", "task_id": task_id.upper(), "status": "completed"}
+        ]
+    ):
+        response = client.post("/api/tasks/bulk", json={"operations": operations}, headers=admin)
+        assert response.status_code == 400
+        assert task_id in response.json()["detail"]
+    
+    # Nothing was written and the counters still match the task
+    task = client.get(f"/api/tasks/{task_id}", headers=admin).json()
+    assert task["status"] == "todo"
+    counts = workload(client, admin, user_id)
+    assert (counts["todo"], counts["completed"], counts["total"]) == (1, 0, 1)
+
+def test_operations_on_different_tasks(client, signup):
+    _, admin = signup("Admin", "admin")
+    user_id, _ = signup("User")
+    other_id, _ = signup("Other")
+    first = create_task(client, admin, user_id, "First")
+    second = create_task(client, admin, user_id, "Second")
+    third = create_task(client, admin, user_id, "Third")
+    
+    response = client.post("/api/tasks/bulk", json={"operations": [
+        {"action": "update_status", "task_id": first, "status": "completed"},
+        {"action": "reassign", "task_id": second, "assigned_to": other_id},
+        {"action": "delete", "task_id": third},
+        {"action": "create", "task": {"title": "Fourth", "assigned_to": other_id}}
+    ]}, headers=admin)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (4, 0)
+    
+    counts = workload(client, admin, user_id)
+    assert (counts["todo"], counts["completed"], counts["total"]) == (0, 1, 1)
+    counts = workload(client, admin, other_id)
+    assert (counts["todo"], counts["total"]) == (2, 2)
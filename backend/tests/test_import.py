@@ -0,0 +1,42 @@
+"""POST /api/users/import and /api/tasks/import"""
+import app.importer as importer
+from conftest import TEST_PASSWORD
+
+USERS_CSV = (
+    "name,email,password,role\r\n"
+    f"Ann Lee,ann@example.com,{TEST_PASSWORD},manager\r\n"
+    f"Bob Ray,bob@example.com,{TEST_PASSWORD},\r\n"
+    f"Dup,ann@example.com,{TEST_PASSWORD},user\r\n"
+)
+
+def test_user_import_uses_the_shared_password_hasher(client, signup, monkeypatch):
+    def no_process_pool(*args, **kwargs):
+        raise AssertionError("API imports must not start a process pool")
+    monkeypatch.setattr(importer, "ProcessPoolExecutor", no_process_pool)
+    _, admin = signup("Admin", "admin")
+    
+    response = client.post(
+        "/api/users/import",
+        files={"file": ("people.csv", USERS_CSV.encode(), "text/csv")},
+        headers=admin
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"] == [{"row": 3, "error": "Email already registered"}]
+    
+    login = client.post("/api/auth/login", json={"email": "ann@example.com", "password": TEST_PASSWORD})
+    assert login.status_code == 200
+    assert login.json()["user"]["role"] == "manager"
+
+def test_import_rejects_non_utf8_before_importing(client, signup):
+    _, admin = signup("Admin", "admin")
+    content = "title\r\nFirst\r\n".encode() + b"\xff\xfe bad\r\n"
+    
+    response = client.post(
+        "/api/tasks/import",
+        files={"file": ("tasks.csv", content, "text/csv")},
+        headers=admin
+    )
+    assert response.status_code == 400
+    assert client.get("/api/tasks", headers=admin).json() == []
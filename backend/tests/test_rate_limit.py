@@ -0,0 +1,13 @@
+"""Parsing of rate limit settings"""
+import pytest
+from app.utils.rate_limit import RateLimit
+
+def test_parse_rate():
+    limit = RateLimit.parse("login", "30/minute")
+    assert limit.capacity == 30
+    assert limit.refill_per_second == 0.5
+
+@pytest.mark.parametrize("rate", ["0/minute", "-1/minute", "5", "5/week", "five/minute"])
+def test_parse_rejects_invalid_rates(rate):
+    with pytest.raises(ValueError):
+        RateLimit.parse("login", rate)
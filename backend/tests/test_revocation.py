@@ -0,0 +1,39 @@
+"""Revocations recorded by one worker reach the others through MongoDB"""
+import asyncio
+from datetime import datetime, timedelta
+import app.utils.revocation as revocation
+from app.utils.revocation import RevocationList, revoke_token, revoke_user_tokens, sync_revocations
+
+class SlowClock(datetime):
+    """datetime of a worker whose clock is 30 seconds behind"""
+    
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() - timedelta(seconds=30)
+
+def test_revocations_from_another_worker_are_synced(monkeypatch):
+    this_worker = RevocationList()
+    other_worker = RevocationList()
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    
+    async def scenario():
+        monkeypatch.setattr(revocation, "revocation_list", this_worker)
+        await revoke_token("first", expires_at)
+        await sync_revocations()
+        
+        # Revoked through another worker, with a slow clock, after this one synced
+        monkeypatch.setattr(revocation, "revocation_list", other_worker)
+        monkeypatch.setattr(revocation, "datetime", SlowClock)
+        assert await revoke_token("second", expires_at)
+        assert not await revoke_token("second", expires_at)
+        await revoke_user_tokens("user-1")
+        
+        monkeypatch.setattr(revocation, "revocation_list", this_worker)
+        monkeypatch.setattr(revocation, "datetime", datetime)
+        await sync_revocations()
+    
+    asyncio.run(scenario())
+    assert this_worker.is_revoked({"jti": "first"})
+    assert this_worker.is_revoked({"jti": "second"})
+    assert this_worker.is_revoked({"jti": "other", "user_id": "user-1", "iat": 0})
+    assert not this_worker.is_revoked({"jti": "other", "user_id": "user-2", "iat": 0})
@@ -0,0 +1,34 @@
+"""Responses of ?fields= requests and the schema they are declared with"""
+from app.models.task import TaskSparseResponse
+from app.models.user import UserSparseResponse
+
+def list_item_schemas(client, path: str) -> set:
+    operation = client.get("/openapi.json").json()["paths"][path]["get"]
+    items = operation["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+    return {schema["$ref"].rsplit("/", 1)[-1] for schema in items["anyOf"]}
+
+def test_task_list_declares_sparse_items(client):
+    assert list_item_schemas(client, "/api/tasks") == {"TaskResponse", "TaskSparseResponse"}
+
+def test_user_list_declares_sparse_items(client):
+    assert list_item_schemas(client, "/api/users") == {"UserResponse", "UserSparseResponse"}
+
+def test_sparse_task_list_matches_sparse_schema(client, signup):
+    _, admin = signup("Admin", "admin")
+    response = client.post("/api/tasks", json={"title": "Task"}, headers=admin)
+    assert response.status_code == 201, response.text
+    
+    response = client.get("/api/tasks", params={"fields": "status"}, headers=admin)
+    assert response.status_code == 200
+    tasks = response.json()
+    assert [set(task) for task in tasks] == [{"id", "status"}]
+    TaskSparseResponse.model_validate(tasks[0])
+
+def test_sparse_user_list_matches_sparse_schema(client, signup):
+    _, admin = signup("Admin", "admin")
+    
+    response = client.get("/api/users", params={"fields": "name"}, headers=admin)
+    assert response.status_code == 200
+    users = response.json()
+    assert [set(user) for user in users] == [{"id", "name"}]
+    UserSparseResponse.model_validate(users[0])
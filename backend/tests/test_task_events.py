@@ -0,0 +1,33 @@
+"""Task writes made through other workers reach open streams as a resync"""
+import asyncio
+from app.utils.etag import bump_collection_version
+from app.utils.events import RESYNC_EVENT, sync_task_events, task_events
+
+def drain(subscription) -> list:
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+def test_writes_through_other_workers_resync_streams(client, signup):
+    _, admin = signup("Admin", "admin")
+    subscription = task_events.subscribe()
+    try:
+        asyncio.run(sync_task_events())
+        
+        # Written through this worker: published directly, no resync
+        response = client.post("/api/tasks", json={"title": "Local"}, headers=admin)
+        assert response.status_code == 201, response.text
+        asyncio.run(sync_task_events())
+        assert [event["type"] for event in drain(subscription)] == ["created"]
+        
+        # Written through another worker: only the version moves
+        asyncio.run(bump_collection_version("tasks"))
+        asyncio.run(sync_task_events())
+        assert drain(subscription) == [RESYNC_EVENT]
+        
+        asyncio.run(sync_task_events())
+        assert drain(subscription) == []
+    finally:
+        task_events.unsubscribe(subscription)
+        task_events.version = None
@@ -0,0 +1,44 @@
+"""Number of users queries behind a page of tasks (no N+1 name lookups)"""
+
+def create_tasks(client, headers: dict, assignees: list, count: int):
+    for i in range(count):
+        response = client.post(
+            "/api/tasks",
+            json={"title": f"Task {i}", "assigned_to": assignees[i % len(assignees)]},
+            headers=headers
+        )
+        assert response.status_code == 201, response.text
+
+def test_task_page_issues_at_most_one_users_query(client, signup, query_log):
+    admin_id, admin = signup("Admin", "admin")
+    assignees = [signup(f"User {i}")[0] for i in range(10)]
+    create_tasks(client, admin, assignees, 30)
+    
+    # Authenticate once so the principal cache holds the admin
+    client.get("/api/users/me", headers=admin)
+    
+    for limit in (5, 30):
+        query_log.clear()
+        response = client.get("/api/tasks", params={"limit": limit}, headers=admin)
+        assert response.status_code == 200
+        tasks = response.json()
+        assert len(tasks) == limit
+        assert all(task["assigned_to_name"].startswith("User ") for task in tasks)
+        assert all(task["created_by_name"] == "Admin" for task in tasks)
+        # User names are resolved for the whole page at once (they are
+        # stored on the tasks), however many distinct users it references
+        assert query_log.count("users") <= 1
+        assert query_log.count("tasks") == 1
+
+def test_task_detail_issues_at_most_one_users_query(client, signup, query_log):
+    _, admin = signup("Admin", "admin")
+    user_id, _ = signup("User")
+    create_tasks(client, admin, [user_id], 1)
+    task_id = client.get("/api/tasks", headers=admin).json()[0]["id"]
+    
+    # The list request above cached the admin's principal
+    query_log.clear()
+    response = client.get(f"/api/tasks/{task_id}", headers=admin)
+    assert response.status_code == 200
+    assert response.json()["assigned_to_name"] == "User"
+    assert query_log.count("users") <= 1
@@ -10,6 +10,10 @@ export const login = async (credentials) => {
     return response.data;
 };
 
+export const logout = async (refreshToken) => {
+    await axiosInstance.post('/api/auth/logout', { refresh_token: refreshToken });
+};
+
 export const getCurrentUser = async () => {
     const response = await axiosInstance.get('/api/users/me');
     return response.data;
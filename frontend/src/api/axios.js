@@ -23,13 +23,49 @@ axiosInstance.interceptors.request.use(
     }
 );
 
+// Exchange the refresh token for new tokens (one request shared by concurrent callers)
+let refreshPromise = null;
+
+export const refreshAccessToken = () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) return Promise.reject(new Error('No refresh token'));
+
+    if (!refreshPromise) {
+        refreshPromise = axios
+            .post(`${API_BASE_URL}/api/auth/refresh`, { refresh_token: refreshToken })
+            .then(({ data }) => {
+                localStorage.setItem('token', data.access_token);
+                localStorage.setItem('refreshToken', data.refresh_token);
+                localStorage.setItem('user', JSON.stringify(data.user));
+                return data.access_token;
+            })
+            .finally(() => {
+                refreshPromise = null;
+            });
+    }
+    return refreshPromise;
+};
+
 // Response interceptor to handle errors
 axiosInstance.interceptors.response.use(
     (response) => response,
-    (error) => {
+    async (error) => {
+        const request = error.config;
+        if (error.response?.status === 401 && request && !request._retried && !request.url.startsWith('/api/auth/')) {
+            // Access token expired or revoked - renew it once and retry
+            request._retried = true;
+            try {
+                const token = await refreshAccessToken();
+                request.headers.Authorization = `Bearer ${token}`;
+                return axiosInstance(request);
+            } catch (refreshError) {
+                // Fall through to logging out
+            }
+        }
         if (error.response?.status === 401) {
             // Unauthorized - clear token and redirect to login
             localStorage.removeItem('token');
+            localStorage.removeItem('refreshToken');
             localStorage.removeItem('user');
             window.location.href = '/login';
         }
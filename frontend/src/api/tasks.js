@@ -5,6 +5,16 @@ export const getTasks = async (params = {}) => {
     return response.data;
 };
 
+export const getTaskStats = async () => {
+    const response = await axiosInstance.get('/api/tasks/stats');
+    return response.data;
+};
+
+export const getCalendarTasks = async (params) => {
+    const response = await axiosInstance.get('/api/tasks/calendar', { params });
+    return response.data;
+};
+
 export const getTask = async (taskId) => {
     const response = await axiosInstance.get(`/api/tasks/${taskId}`);
     return response.data;
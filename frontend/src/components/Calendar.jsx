@@ -1,48 +1,48 @@
-import { useEffect, useState } from 'react';
+import { useState } from 'react';
 import FullCalendar from '@fullcalendar/react';
 import dayGridPlugin from '@fullcalendar/daygrid';
 import timeGridPlugin from '@fullcalendar/timegrid';
 import interactionPlugin from '@fullcalendar/interaction';
-import { getTasks } from '../api/tasks';
+import { getCalendarTasks, getTask } from '../api/tasks';
 import { getStatusLabel } from '../utils/helpers';
 
 const Calendar = () => {
-    const [events, setEvents] = useState([]);
     const [loading, setLoading] = useState(true);
     const [selectedTask, setSelectedTask] = useState(null);
 
-    useEffect(() => {
-        fetchTasks();
-    }, []);
-
-    const fetchTasks = async () => {
+    // FullCalendar calls this with the visible date range whenever it changes
+    const fetchEvents = async (fetchInfo, successCallback, failureCallback) => {
         try {
-            setLoading(true);
-            const tasks = await getTasks();
-
-            const calendarEvents = tasks
-                .filter(task => task.due_date)
-                .map(task => ({
-                    id: task.id,
-                    title: task.title,
-                    start: task.due_date,
-                    // We'll handle styling in renderEventContent, so we make default styles transparent
-                    backgroundColor: 'transparent',
-                    borderColor: 'transparent',
-                    classNames: ['custom-calendar-event'],
-                    extendedProps: { ...task }
-                }));
-
-            setEvents(calendarEvents);
+            const tasks = await getCalendarTasks({
+                start_date: fetchInfo.start.toISOString(),
+                end_date: fetchInfo.end.toISOString()
+            });
+
+            successCallback(tasks.map(task => ({
+                id: task.id,
+                title: task.title,
+                start: task.due_date,
+                // We'll handle styling in renderEventContent, so we make default styles transparent
+                backgroundColor: 'transparent',
+                borderColor: 'transparent',
+                classNames: ['custom-calendar-event'],
+                extendedProps: { ...task }
+            })));
         } catch (error) {
             console.error('Failed to fetch tasks:', error);
-        } finally {
-            setLoading(false);
+            failureCallback(error);
         }
     };
 
-    const handleEventClick = (info) => {
+    const handleEventClick = async (info) => {
         setSelectedTask(info.event.extendedProps);
+        try {
+            // Calendar events are compact; load the full task for the details modal
+            const task = await getTask(info.event.id);
+            setSelectedTask(task);
+        } catch (error) {
+            console.error('Failed to fetch task:', error);
+        }
     };
 
     const closeModal = () => {
@@ -68,16 +68,14 @@ const Calendar = () => {
         );
     };
 
-    if (loading) {
-        return (
-            <div className="flex items-center justify-center h-96">
-                <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-indigo-600"></div>
-            </div>
-        );
-    }
-
     return (
-        <div className="bg-white rounded-2xl border border-gray-200 p-6 shadow-sm">
+        <div className="bg-white rounded-2xl border border-gray-200 p-6 shadow-sm relative">
+            {loading && (
+                <div className="absolute inset-0 z-10 flex items-center justify-center bg-white/60 rounded-2xl">
+                    <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-indigo-600"></div>
+                </div>
+            )}
+
             <style>{`
                 .fc-theme-standard td, .fc-theme-standard th { border-color: #f1f5f9; }
                 .fc-col-header-cell-cushion { color: #64748b; font-weight: 600; font-size: 0.8rem; text-transform: uppercase; letter-spacing: 0.05em; padding: 16px 0 !important; }
@@ -113,7 +111,8 @@ const Calendar = () => {
                     center: 'title',
                     right: 'dayGridMonth,timeGridWeek'
                 }}
-                events={events}
+                events={fetchEvents}
+                loading={setLoading}
                 eventClick={handleEventClick}
                 eventContent={renderEventContent}
                 height="auto"
@@ -1,5 +1,5 @@
 import { createContext, useState, useEffect } from 'react';
-import { login as loginApi, signup as signupApi } from '../api/auth';
+import { login as loginApi, signup as signupApi, logout as logoutApi } from '../api/auth';
 
 export const AuthContext = createContext(null);
 
@@ -18,6 +18,7 @@ export const AuthProvider = ({ children }) => {
             } catch (error) {
                 console.error('Error parsing saved user:', error);
                 localStorage.removeItem('token');
+                localStorage.removeItem('refreshToken');
                 localStorage.removeItem('user');
             }
         }
@@ -28,6 +29,7 @@ export const AuthProvider = ({ children }) => {
         try {
             const data = await loginApi(credentials);
             localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refreshToken', data.refresh_token);
             localStorage.setItem('user', JSON.stringify(data.user));
             setUser(data.user);
             return { success: true };
@@ -43,6 +45,7 @@ export const AuthProvider = ({ children }) => {
         try {
             const data = await signupApi(userData);
             localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refreshToken', data.refresh_token);
             localStorage.setItem('user', JSON.stringify(data.user));
             setUser(data.user);
             return { success: true };
@@ -55,7 +58,11 @@ export const AuthProvider = ({ children }) => {
     };
 
     const logout = () => {
+        // Revoke the tokens server-side; local state is cleared either way
+        const refreshToken = localStorage.getItem('refreshToken');
+        logoutApi(refreshToken).catch(() => {});
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         localStorage.removeItem('user');
         setUser(null);
     };
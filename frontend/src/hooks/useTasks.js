@@ -1,5 +1,7 @@
 import { useState, useEffect } from 'react';
 import { getTasks } from '../api/tasks';
+import { refreshAccessToken } from '../api/axios';
+import { API_BASE_URL } from '../utils/constants';
 
 export const useTasks = (filters = {}) => {
     const [tasks, setTasks] = useState([]);
@@ -23,5 +25,75 @@ export const useTasks = (filters = {}) => {
         fetchTasks();
     }, [JSON.stringify(filters)]);
 
-    return { tasks, loading, error, refetch: fetchTasks };
+    const matchesFilters = (task) => !filters.status || task.status === filters.status;
+
+    // Put a created or updated task into the list (or drop it if it no longer matches)
+    const applyTask = (task) => {
+        setTasks(prev => {
+            if (prev.some(t => t.id === task.id)) {
+                return prev
+                    .map(t => t.id === task.id ? task : t)
+                    .filter(t => t.id !== task.id || matchesFilters(t));
+            }
+            // Search results are ranked by the server, so only add to plain lists
+            if (filters.search || !matchesFilters(task)) return prev;
+            return [task, ...prev];
+        });
+    };
+
+    const removeTask = (taskId) => {
+        setTasks(prev => prev.filter(t => t.id !== taskId));
+    };
+
+    // Apply live changes made by other users. The stream only carries
+    // writes handled by the worker process it is connected to, so the
+    // caller still applies the responses of its own writes
+    useEffect(() => {
+        if (!localStorage.getItem('token') || typeof EventSource === 'undefined') return;
+
+        let source = null;
+        let opened = false;
+        let stopped = false;
+
+        const upsertTask = (event) => applyTask(JSON.parse(event.data));
+
+        const connect = () => {
+            if (stopped) return;
+            const token = localStorage.getItem('token');
+            const current = new EventSource(
+                `${API_BASE_URL}/api/tasks/stream?access_token=${encodeURIComponent(token)}`
+            );
+            source = current;
+
+            // Refetch after a reconnect, since changes may have been missed
+            current.onopen = () => {
+                if (opened) fetchTasks();
+                opened = true;
+            };
+
+            // The browser gives up when the token is rejected (e.g. expired):
+            // renew it and reconnect
+            current.onerror = () => {
+                if (current.readyState === EventSource.CLOSED) {
+                    refreshAccessToken().then(connect).catch(() => {});
+                }
+            };
+
+            current.addEventListener('created', upsertTask);
+            current.addEventListener('updated', upsertTask);
+
+            current.addEventListener('deleted', (event) => removeTask(JSON.parse(event.data).id));
+
+            current.addEventListener('resync', () => fetchTasks());
+        };
+
+        connect();
+
+        return () => {
+            stopped = true;
+            source?.close();
+        };
+    }, [JSON.stringify(filters)]);
+
+    return { tasks, loading, error, refetch: fetchTasks, applyTask, removeTask };
 };
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import { useAuth } from '../hooks/useAuth';
-import { getTasks } from '../api/tasks';
+import { getTaskStats } from '../api/tasks';
 import { Link } from 'react-router-dom';
 import { ROLES } from '../utils/constants';
 
@@ -21,13 +21,13 @@ const Dashboard = () => {
 
     const fetchStats = async () => {
         try {
-            const tasks = await getTasks();
+            const data = await getTaskStats();
             setStats({
-                total: tasks.length,
-                todo: tasks.filter(t => t.status === 'todo').length,
-                inProgress: tasks.filter(t => t.status === 'in_progress').length,
-                completed: tasks.filter(t => t.status === 'completed').length,
-                pending: tasks.filter(t => t.status !== 'completed').length
+                total: data.total,
+                todo: data.todo,
+                inProgress: data.in_progress,
+                completed: data.completed,
+                pending: data.total - data.completed
             });
         } catch (error) {
             console.error('Failed to fetch stats:', error);
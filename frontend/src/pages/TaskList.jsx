@@ -12,7 +12,8 @@ const TaskList = () => {
     const { user } = useAuth();
     const [filters, setFilters] = useState({});
     const [searchTerm, setSearchTerm] = useState('');
-    const { tasks, loading, error, refetch } = useTasks({ ...filters, search: searchTerm });
+    // Own writes are applied from their responses; other users' changes arrive over the live stream
+    const { tasks, loading, error, applyTask, removeTask } = useTasks({ ...filters, search: searchTerm });
     const [showForm, setShowForm] = useState(false);
     const [editingTask, setEditingTask] = useState(null);
 
@@ -26,9 +27,8 @@ const TaskList = () => {
 
     const handleCreateTask = async (taskData) => {
         try {
-            await createTask(taskData);
+            applyTask(await createTask(taskData));
             setShowForm(false);
-            refetch();
         } catch (error) {
             alert(error.response?.data?.detail || 'Failed to create task');
         }
@@ -36,10 +36,9 @@ const TaskList = () => {
 
     const handleUpdateTask = async (taskData) => {
         try {
-            await updateTask(editingTask.id, taskData);
+            applyTask(await updateTask(editingTask.id, taskData));
             setEditingTask(null);
             setShowForm(false);
-            refetch();
         } catch (error) {
             alert(error.response?.data?.detail || 'Failed to update task');
         }
@@ -50,7 +49,7 @@ const TaskList = () => {
 
         try {
             await deleteTask(taskId);
-            refetch();
+            removeTask(taskId);
         } catch (error) {
             alert(error.response?.data?.detail || 'Failed to delete task');
         }
@@ -58,8 +57,7 @@ const TaskList = () => {
 
     const handleStatusChange = async (taskId, newStatus) => {
         try {
-            await updateTask(taskId, { status: newStatus });
-            refetch();
+            applyTask(await updateTask(taskId, { status: newStatus }));
         } catch (error) {
             alert(error.response?.data?.detail || 'Failed to update status');
         }